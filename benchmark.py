@@ -0,0 +1,567 @@
+import argparse
+import io
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Iterator
+
+import psutil
+import requests
+
+from camera_search import (
+    CameraConnectionPool,
+    LiveviewBroadcaster,
+    LiveviewFrame,
+    LiveviewPacketParser,
+    SSDPSearch,
+)
+from fake_camera import FakeCamera, build_fake_jpeg, build_liveview_packet
+
+
+class _ChunkedStream(io.RawIOBase):
+    """
+    Serves the data in chunks of at most chunk_size bytes, like a socket would.
+    """
+
+    def __init__(self, data: bytes, chunk_size: int):
+        self._data = memoryview(data)
+        self._position = 0
+        self.chunk_size = chunk_size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.chunk_size, len(self._data) - self._position)
+        buffer[:size] = self._data[self._position : self._position + size]
+        self._position += size
+        return size
+
+
+class _CopyingStream(_ChunkedStream):
+    """
+    readinto like urllib3 (the raw response of requests): reads into a new bytes object first and
+    copies that into the buffer.
+    """
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.chunk_size, len(self._data) - self._position)
+        data = bytes(self._data[self._position : self._position + size])
+        buffer[:size] = data
+        self._position += size
+        return size
+
+
+def scan_jpeg_markers(stream, chunk_size: int = 1024) -> Iterator[bytes]:
+    """
+    The previous relay loop: concatenates 1 KB chunks and searches for the FFD8/FFD9 markers.
+    """
+    buffer = b""
+    chunk = bytearray(chunk_size)
+    while True:
+        read = stream.readinto(chunk)
+        if not read:
+            return
+        buffer += chunk[:read]
+        while True:
+            start_jpeg = buffer.find(b"\xff\xd8")
+            end_jpeg = buffer.find(b"\xff\xd9")
+            if start_jpeg != -1 and end_jpeg != -1 and end_jpeg > start_jpeg:
+                yield buffer[start_jpeg : end_jpeg + 2]
+                buffer = buffer[end_jpeg + 2 :]
+            else:
+                break
+
+
+def parse_packets(stream) -> Iterator[LiveviewFrame]:
+    return LiveviewPacketParser(stream).iter_jpeg_frames()
+
+
+def _traced_blocks() -> int:
+    return sum(
+        stat.count for stat in tracemalloc.take_snapshot().statistics("filename")
+    )
+
+
+def _measure_allocations(frames: Iterator) -> dict:
+    """
+    Allocations per frame, traced with tracemalloc. All frames are kept until the end, so that
+    the blocks still allocated afterwards are the ones each frame costs. Temporary copies are
+    freed before the next frame, they show up as the peak above the retained memory.
+    """
+    kept = []
+    tracemalloc.start()
+    blocks_before = _traced_blocks()
+    start_size, _ = tracemalloc.get_traced_memory()
+    temporary = 0
+    for frame in frames:
+        size, peak = tracemalloc.get_traced_memory()
+        temporary = max(temporary, peak - size)
+        tracemalloc.reset_peak()
+        kept.append(frame)
+    size, _ = tracemalloc.get_traced_memory()
+    blocks = _traced_blocks() - blocks_before
+    tracemalloc.stop()
+    frame_count = max(len(kept), 1)
+    return {
+        "allocated_blocks_per_frame": round(blocks / frame_count, 1),
+        "allocated_kb_per_frame": round((size - start_size) / frame_count / 1024, 1),
+        "max_temporary_kb_per_frame": round(temporary / 1024, 1),
+    }
+
+
+def _measure(function, stream_class, data: bytes, chunk_size: int) -> dict:
+    start = time.perf_counter()
+    frames = sum(1 for _ in function(stream_class(data, chunk_size)))
+    elapsed = time.perf_counter() - start
+
+    # Second run with tracing, tracemalloc slows the loop down too much to measure both at once
+    result = {
+        "frames": frames,
+        "seconds": round(elapsed, 4),
+        "mb_per_s": round(len(data) / elapsed / 1e6, 1),
+    }
+    result.update(_measure_allocations(function(stream_class(data, chunk_size))))
+    return result
+
+
+def _measure_loopback(open_stream, frame_count: int, frame_size: int) -> dict:
+    """
+    The production path: the packet parser reading the live view stream of the fake camera over
+    a loopback socket, sent as fast as possible.
+    """
+    with FakeCamera(
+        fps=1_000_000, frame_size=frame_size, frame_count=frame_count
+    ) as camera:
+        stream = open_stream(camera.liveview_url)
+        start = time.perf_counter()
+        frames = sum(1 for _ in parse_packets(stream))
+        elapsed = time.perf_counter() - start
+        stream.close()
+        result = {
+            "frames": frames,
+            "seconds": round(elapsed, 4),
+            "mb_per_s": round(frames * frame_size / elapsed / 1e6, 1),
+        }
+        stream = open_stream(camera.liveview_url)
+        result.update(_measure_allocations(parse_packets(stream)))
+        stream.close()
+    return result
+
+
+def _open_requests_stream(url: str):
+    return requests.get(url, stream=True).raw
+
+
+def benchmark_parser(frame_count: int, frame_size: int, chunk_size: int) -> dict:
+    """
+    Compares the FFD8/FFD9 marker scan with the packet parser on the same synthetic stream,
+    read with a zero-copy readinto (like http.client) and a copying one (like urllib3), and the
+    packet parser on a loopback socket through http.client and through requests.
+    """
+    jpeg = build_fake_jpeg(frame_size)
+    data = b"".join(
+        build_liveview_packet(jpeg, i, i * 33, padding_size=i % 8)
+        for i in range(frame_count)
+    )
+    return {
+        "frame_count": frame_count,
+        "frame_size": frame_size,
+        "chunk_size": chunk_size,
+        "marker_scan": _measure(scan_jpeg_markers, _ChunkedStream, data, chunk_size),
+        "packet_parser": _measure(parse_packets, _ChunkedStream, data, chunk_size),
+        "packet_parser_copying_readinto": _measure(
+            parse_packets, _CopyingStream, data, chunk_size
+        ),
+        "loopback_http_client": _measure_loopback(
+            LiveviewBroadcaster.open_camera_stream, frame_count, frame_size
+        ),
+        "loopback_requests": _measure_loopback(
+            _open_requests_stream, frame_count, frame_size
+        ),
+    }
+
+
+def _latency_summary(latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+def benchmark_discovery(runs: int, timeout: float) -> dict:
+    """
+    Time to first result of the SSDP search against the fake camera's responder, and the time
+    until its device description has been fetched as well.
+    """
+    with FakeCamera() as camera:
+        searcher = SSDPSearch(timeout=timeout)
+        searcher.SSDP_MULTICAST_IP, searcher.SSDP_MULTICAST_PORT = camera.ssdp_address
+        first_result = []
+        device_description = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            headers = searcher._search_response([camera.host])
+            first_result.append(time.perf_counter() - start)
+            if headers is None:
+                raise RuntimeError("The fake camera did not answer the M-SEARCH.")
+            requests.get(headers["LOCATION"], timeout=timeout).raise_for_status()
+            device_description.append(time.perf_counter() - start)
+    return {
+        "runs": runs,
+        "time_to_first_result": _latency_summary(first_result),
+        "time_to_device_description": _latency_summary(device_description),
+    }
+
+
+def benchmark_control(calls: int, latency: float, pool_size: int) -> dict:
+    """
+    Per-call latency of control requests against the fake camera: a new connection per request
+    (the previous requests.post), the pooled keep-alive connections and the complete round trip
+    through the local service.
+    """
+    payload = {"method": "getEvent", "params": [False], "id": 1, "version": "1.0"}
+    pool = CameraConnectionPool(pool_size=pool_size)
+
+    def measure(post, url) -> dict:
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            post(url, payload).json()
+            latencies.append(time.perf_counter() - start)
+        return _latency_summary(latencies)
+
+    with FakeCamera(latency=latency) as camera:
+        url = camera.endpoint("camera")
+        process, service_url = _start_local_service("threading")
+        try:
+            return {
+                "calls": calls,
+                "camera_latency_ms": latency * 1000,
+                "new_connection": measure(lambda u, p: requests.post(u, json=p), url),
+                "pooled": measure(pool.post, url),
+                "local_service": measure(
+                    lambda u, p: requests.post(
+                        f"{service_url}/camera_control",
+                        json={"action_list_url": u, "payload": p},
+                    ),
+                    url,
+                ),
+            }
+        finally:
+            pool.close()
+            process.kill()
+            process.wait()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_local_service(mode: str) -> tuple[subprocess.Popen, str]:
+    """
+    Starts camera_search.py in the given server mode and waits until it accepts connections.
+    """
+    port = _free_port()
+    script = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "camera_search.py"
+    )
+    process = subprocess.Popen(
+        [sys.executable, script, "--server", mode, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"Local service ({mode}) did not start.")
+
+
+def _start_liveview(service_url: str, camera: FakeCamera):
+    requests.post(
+        f"{service_url}/camera_control",
+        json={
+            "action_list_url": camera.endpoint("camera"),
+            "action": "startLiveview",
+            "payload": {
+                "method": "startLiveview",
+                "params": [],
+                "id": 1,
+                "version": "1.0",
+            },
+        },
+    ).raise_for_status()
+
+
+def _read_liveview(url: str, stop: threading.Event, received: list):
+    """
+    Reads the MJPEG stream of the local service, received holds frame count and byte count.
+    """
+    with requests.get(url, stream=True, timeout=10) as response:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            received[0] += chunk.count(b"--myboundary")
+            received[1] += len(chunk)
+            if stop.is_set():
+                return
+
+
+def _start_liveview_clients(
+    service_url: str, client_count: int, stop: threading.Event
+) -> list[list]:
+    counters = []
+    for _ in range(client_count):
+        received = [0, 0]
+        counters.append(received)
+        threading.Thread(
+            target=_read_liveview,
+            args=(f"{service_url}/liveview", stop, received),
+            daemon=True,
+        ).start()
+    return counters
+
+
+def benchmark_liveview(
+    mode: str, client_counts: list[int], duration: float, fps: int, frame_size: int
+) -> dict:
+    """
+    Live view relay through the local service: with one client the relay throughput, with more
+    clients the fan-out scaling. The CPU time of the local service is divided by the frames it
+    parsed from the camera, the fake camera counts its live view connections.
+    """
+    results = {"mode": mode, "fps": fps, "frame_size": frame_size, "clients": {}}
+    with FakeCamera(fps=fps, frame_size=frame_size) as camera:
+        for client_count in client_counts:
+            process, service_url = _start_local_service(mode)
+            stop = threading.Event()
+            try:
+                _start_liveview(service_url, camera)
+                counters = _start_liveview_clients(service_url, client_count, stop)
+                # Let the streams settle before measuring
+                time.sleep(1)
+
+                service = psutil.Process(process.pid)
+                for received in counters:
+                    received[:] = [0, 0]
+                parsed_before = _frames_parsed(service_url)
+                cpu_before = sum(service.cpu_times()[:2])
+                start = time.perf_counter()
+                time.sleep(duration)
+                elapsed = time.perf_counter() - start
+                cpu = sum(service.cpu_times()[:2]) - cpu_before
+                parsed = _frames_parsed(service_url) - parsed_before
+
+                frames = sum(received[0] for received in counters)
+                received_bytes = sum(received[1] for received in counters)
+                results["clients"][str(client_count)] = {
+                    "upstream_connections": camera.liveview_connections,
+                    "upstream_fps": round(parsed / elapsed, 1),
+                    "fps_per_client": round(frames / client_count / elapsed, 1),
+                    "mb_per_s_total": round(received_bytes / elapsed / 1e6, 2),
+                    "cpu_ms_per_upstream_frame": round(cpu * 1000 / max(parsed, 1), 3),
+                    "cpu_ms_per_delivered_frame": round(cpu * 1000 / max(frames, 1), 3),
+                }
+            finally:
+                stop.set()
+                process.kill()
+                process.wait()
+            # The camera notices the closed connection with its next frame
+            time.sleep(2 / fps)
+    return results
+
+
+def _frames_parsed(service_url: str) -> int:
+    broadcasters = requests.get(f"{service_url}/liveview/stats").json()["broadcasters"]
+    return sum(broadcaster["frames_parsed"] for broadcaster in broadcasters)
+
+
+def benchmark_server(
+    modes: list[str], client_counts: list[int], calls: int, fps: int, frame_size: int
+) -> dict:
+    """
+    Control call latency through the local service while 1, 10, 50... live view clients are
+    connected, for the threading and the asyncio server.
+    """
+    results = {"calls": calls, "fps": fps, "frame_size": frame_size, "modes": {}}
+    payload = {"method": "getEvent", "params": [False], "id": 1, "version": "1.0"}
+    with FakeCamera(fps=fps, frame_size=frame_size) as camera:
+        for mode in modes:
+            results["modes"][mode] = {}
+            for client_count in client_counts:
+                process, service_url = _start_local_service(mode)
+                stop = threading.Event()
+                try:
+                    _start_liveview(service_url, camera)
+                    counters = _start_liveview_clients(service_url, client_count, stop)
+                    # Let the streams settle before measuring
+                    time.sleep(1)
+
+                    for received in counters:
+                        received[:] = [0, 0]
+                    latencies = []
+                    start = time.perf_counter()
+                    for _ in range(calls):
+                        call_start = time.perf_counter()
+                        requests.post(
+                            f"{service_url}/camera_control",
+                            json={
+                                "action_list_url": camera.endpoint("camera"),
+                                "payload": payload,
+                            },
+                        ).json()
+                        latencies.append(time.perf_counter() - call_start)
+                    elapsed = time.perf_counter() - start
+
+                    result = _latency_summary(latencies)
+                    result["server_threads"] = psutil.Process(process.pid).num_threads()
+                    frames = sum(received[0] for received in counters)
+                    result["liveview_fps_per_client"] = round(
+                        frames / max(client_count, 1) / elapsed, 1
+                    )
+                    results["modes"][mode][str(client_count)] = result
+                finally:
+                    stop.set()
+                    process.kill()
+                    process.wait()
+    return results
+
+
+def benchmark_all(args) -> dict:
+    """
+    Runs every benchmark with its default settings, so that runs can be compared.
+    """
+    return {
+        "parser": benchmark_parser(args.frames, args.frame_size, 64 * 1024),
+        "discovery": benchmark_discovery(args.runs, 2),
+        "control": benchmark_control(args.calls, args.latency, 4),
+        "liveview": {
+            mode: benchmark_liveview(
+                mode, args.clients, args.duration, args.fps, args.frame_size
+            )
+            for mode in ("threading", "asyncio")
+        },
+        "server": benchmark_server(
+            ["threading", "asyncio"],
+            args.clients,
+            args.calls,
+            args.fps,
+            args.frame_size,
+        ),
+    }
+
+
+def _client_counts(value: str) -> list[int]:
+    return [int(count) for count in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the local service.")
+    parser.add_argument(
+        "--output", help="additionally write the results as JSON into this file"
+    )
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    parser_benchmark = subparsers.add_parser(
+        "parser", help="Live view parsing: marker scan vs. packet parser."
+    )
+    parser_benchmark.add_argument("--frames", type=int, default=100)
+    parser_benchmark.add_argument("--frame-size", type=int, default=300_000)
+    parser_benchmark.add_argument("--chunk-size", type=int, default=64 * 1024)
+
+    discovery_benchmark = subparsers.add_parser(
+        "discovery", help="SSDP time to first result against the fake camera."
+    )
+    discovery_benchmark.add_argument("--runs", type=int, default=20)
+    discovery_benchmark.add_argument("--timeout", type=float, default=2)
+
+    control_benchmark = subparsers.add_parser(
+        "control", help="Control call latency: new connection, pooled, local service."
+    )
+    control_benchmark.add_argument("--calls", type=int, default=500)
+    control_benchmark.add_argument("--latency", type=float, default=0.0)
+    control_benchmark.add_argument("--pool-size", type=int, default=4)
+
+    liveview_benchmark = subparsers.add_parser(
+        "liveview", help="Live view relay throughput and fan-out scaling."
+    )
+    liveview_benchmark.add_argument(
+        "--server", choices=["threading", "asyncio"], default="threading"
+    )
+    liveview_benchmark.add_argument(
+        "--clients", type=_client_counts, default=[1, 10, 50]
+    )
+    liveview_benchmark.add_argument("--duration", type=float, default=3)
+    liveview_benchmark.add_argument("--fps", type=int, default=30)
+    liveview_benchmark.add_argument("--frame-size", type=int, default=100_000)
+
+    server_benchmark = subparsers.add_parser(
+        "server",
+        help="Control latency under live view load: threading vs. asyncio server.",
+    )
+    server_benchmark.add_argument("--modes", default="threading,asyncio")
+    server_benchmark.add_argument("--clients", type=_client_counts, default=[1, 10, 50])
+    server_benchmark.add_argument("--calls", type=int, default=200)
+    server_benchmark.add_argument("--fps", type=int, default=30)
+    server_benchmark.add_argument("--frame-size", type=int, default=100_000)
+
+    all_benchmark = subparsers.add_parser("all", help="Run all benchmarks.")
+    all_benchmark.add_argument("--frames", type=int, default=100)
+    all_benchmark.add_argument("--frame-size", type=int, default=100_000)
+    all_benchmark.add_argument("--runs", type=int, default=20)
+    all_benchmark.add_argument("--calls", type=int, default=200)
+    all_benchmark.add_argument("--latency", type=float, default=0.0)
+    all_benchmark.add_argument("--clients", type=_client_counts, default=[1, 10, 50])
+    all_benchmark.add_argument("--duration", type=float, default=3)
+    all_benchmark.add_argument("--fps", type=int, default=30)
+
+    args = parser.parse_args()
+    if args.benchmark == "parser":
+        result = benchmark_parser(args.frames, args.frame_size, args.chunk_size)
+    elif args.benchmark == "discovery":
+        result = benchmark_discovery(args.runs, args.timeout)
+    elif args.benchmark == "control":
+        result = benchmark_control(args.calls, args.latency, args.pool_size)
+    elif args.benchmark == "liveview":
+        result = benchmark_liveview(
+            args.server, args.clients, args.duration, args.fps, args.frame_size
+        )
+    elif args.benchmark == "server":
+        result = benchmark_server(
+            args.modes.split(","), args.clients, args.calls, args.fps, args.frame_size
+        )
+    else:
+        result = benchmark_all(args)
+
+    result = {
+        "benchmark": args.benchmark,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": result,
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
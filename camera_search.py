@@ -1,11 +1,22 @@
+import argparse
+import asyncio
+import http.client
+import random
+import selectors
 import socket
+import struct
 import time
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import json
 import threading
-from typing import Any
-from urllib.parse import urlparse
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from typing import Any, Iterator
+from urllib.parse import parse_qs, urlparse
 import psutil
 
 
@@ -17,86 +28,200 @@ class SSDPSearch:
     SSDP_MULTICAST_IP = "239.255.255.250"
     SSDP_MULTICAST_PORT = 1900
 
+    # Retransmits of the M-SEARCH start after FIRST_RETRANSMIT seconds and back off up to MAX_RETRANSMIT_DELAY
+    FIRST_RETRANSMIT_DELAY = 0.1
+    MAX_RETRANSMIT_DELAY = 1.0
+    SEARCH_TARGET = "urn:schemas-sony-com:service:ScalarWebAPI:1"
+
+    def __init__(
+        self,
+        timeout: float = 8,
+        retransmits: int = 4,
+        registry: "CameraRegistry | None" = None,
+        interfaces: list[str] | None = None,
+        multicast_address: tuple[str, int] | None = None,
+    ):
+        # Found cameras are stored in the registry, so that later requests can be answered from memory
+        self.registry = registry
+        # Total time in seconds for the search and fetching the device description of the camera
+        self.timeout = timeout
+        # Number of M-SEARCH requests sent after the first one to increase the probability that the camera responses
+        self.retransmits = retransmits
+        # IPs of the local interfaces to search on, by default all assigned ones except loopback
+        self.interfaces = interfaces
+        # Where the M-SEARCH is sent to, by default the SSDP multicast group
+        self.multicast_address = multicast_address or (
+            self.SSDP_MULTICAST_IP,
+            self.SSDP_MULTICAST_PORT,
+        )
+
     def retrieve_device_descriptions(self) -> Any:
         """
-        Get location URL using SSDP M-Search.
+        Get location URL using SSDP M-Search and fetch the device description XML of the camera.
         """
         print("Fetching camera infos...")
+        deadline = time.monotonic() + self.timeout
+        # Best to bind device IP directly to ensure SSDP sends request through correct inteface
+        ips = self.interfaces or self._get_assigned_ip()
+        if not ips:
+            print("Could not find a valid IP to connect with the camera.")
+            return None
+
+        try:
+            headers = self._search_response(ips, deadline)
+        except Exception as e:
+            print(f"Error: Failed to fetch location URL.\n{str(e)}")
+            return None
+        if not headers:
+            print("Could not find a valid IP to connect with the camera.")
+            return None
+
+        # The device description only gets the time left of the total timeout
+        location_url = headers["LOCATION"]
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            print("Timeout reached before fetching the device description.")
+            return None
+        try:
+            response = requests.get(location_url, timeout=remaining)
+        except requests.RequestException as e:
+            print(f"Error: Failed to fetch device description.\n{str(e)}")
+            return None
+        if response.status_code == 200:
+            xml_content = response.content
+            print("XML content fetched successfully!")
+            if self.registry is not None:
+                self.registry.update(
+                    headers.get("USN", location_url),
+                    location_url,
+                    CameraRegistry.parse_max_age(headers.get("CACHE-CONTROL", "")),
+                    xml_content,
+                )
+            return xml_content
+        return None
+
+    def _build_m_search(self) -> bytes:
         # SSDP M-SEARCH request to discover the camera
-        M_SEARCH = (
+        return (
             f"M-SEARCH * HTTP/1.1\r\n"
             f"HOST: {self.SSDP_MULTICAST_IP}:{self.SSDP_MULTICAST_PORT}\r\n"
             'MAN: "ssdp:discover"\r\n'
             "MX: 1\r\n"
-            "ST: urn:schemas-sony-com:service:ScalarWebAPI:1\r\n"
+            f"ST: {self.SEARCH_TARGET}\r\n"
             "USER-AGENT: Django/5.0 Python/3.x\r\n\r\n"
         ).encode(
             "utf-8"
         )  # Convert to a byte string
 
-        # Best to bind device IP directly to ensure SSDP sends request through correct inteface
-        ips = self._get_assigned_ip()
-
-        for ip in ips:
-            # Create socket for sending and receiving UDP packets over IPv4, necessary for SSDP
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-            # Allow socket to reuse the address and set socket options
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            # Allows multiple sockets to bind to the same address and port -> in case OS hasnt closed the socket zb. from previous run
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            # Extend to Broadcast by inceasing buffer size
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
-            sock.bind((ip, 0))
-
-            # Send M-SEARCH requests multiple times to increase probability that camera reponses
-            for i in range(5):
-                sock.sendto(
-                    M_SEARCH, (self.SSDP_MULTICAST_IP, self.SSDP_MULTICAST_PORT)
+    def _retransmit_delays(self) -> list[float]:
+        """
+        Delays between the M-SEARCH requests: exponential backoff with jitter, so that
+        several interfaces (and several local services) do not send in lockstep.
+        """
+        delays = []
+        delay = self.FIRST_RETRANSMIT_DELAY
+        for _ in range(self.retransmits):
+            delays.append(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self.MAX_RETRANSMIT_DELAY)
+        return delays
+
+    def _search_response(
+        self, ips: list[str], deadline: float = None
+    ) -> dict[str, str] | None:
+        """
+        Sends M-SEARCH requests over all given interfaces at the same time and returns the
+        headers of the first Sony ScalarWebAPI device responding, or None at the deadline
+        (time.monotonic(), by default after the timeout).
+        """
+        m_search = self._build_m_search()
+        target = self.multicast_address
+        selector = selectors.DefaultSelector()
+        # Per socket the remaining retransmit delays and the time of the next M-SEARCH
+        schedule = {}
+        start_time = time.monotonic()
+        if deadline is None:
+            deadline = start_time + self.timeout
+        try:
+            for ip in ips:
+                # Create socket for sending and receiving UDP packets over IPv4, necessary for SSDP
+                sock = socket.socket(
+                    socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP
                 )
-                time.sleep(1)
+                # Allow socket to reuse the address and set socket options
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                # Allows multiple sockets to bind to the same address and port -> in case OS hasnt closed the socket zb. from previous run
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                # Extend to Broadcast by inceasing buffer size
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+                sock.setblocking(False)
+                try:
+                    sock.bind((ip, 0))
+                except OSError as e:
+                    print(f"Skipping interface {ip}: {e}")
+                    sock.close()
+                    continue
+                selector.register(sock, selectors.EVENT_READ)
+                schedule[sock] = (self._retransmit_delays(), start_time)
 
-            location_url = None
-            start_time = time.time()
-            timeout = 8  # Total timeout in seconds
-            # Set a dynamic socket timeout to ensure that waiting for a response only takes exactly that long
-            try:
-                while True:
-                    # Calculate remaining time
-                    elapsed = time.time() - start_time
-                    remaining = timeout - elapsed
-                    if remaining <= 0:
-                        break
-                    sock.settimeout(remaining)
+            while True:
+                now = time.monotonic()
+                if now >= deadline or not schedule:
+                    return None
+
+                # Send all M-SEARCH requests which are due, without waiting in between
+                for sock, (delays, next_send) in list(schedule.items()):
+                    if next_send is None or next_send > now:
+                        continue
                     try:
-                        data, _ = sock.recvfrom(1024)
-                        response_str = data.decode("utf-8")
-
-                        # Parse the response to get the LOCATION URL
-                        for line in response_str.splitlines():
-                            if line.startswith("LOCATION"):
-                                location_url = line.split(" ", 1)[1]
-                                break
-                        if location_url:
-                            break  # Exit loop if LOCATION URL is found
-                    except socket.timeout:
-                        continue  # No data received, continue waiting
-            except Exception as e:
-                print(f"Error: Failed to fetch location URL.\n{str(e)}")
-                return None
-            finally:
-                sock.close()
+                        sock.sendto(m_search, target)
+                    except OSError as e:
+                        print(f"Failed to send M-SEARCH: {e}")
+                    schedule[sock] = (
+                        delays[1:],
+                        now + delays[0] if delays else None,
+                    )
 
-            if not location_url:
-                continue
+                # Wait for responses until the next M-SEARCH is due or the deadline is reached
+                pending = [next_send for _, next_send in schedule.values() if next_send]
+                wake_up = min(pending + [deadline])
+                for key, _ in selector.select(max(wake_up - time.monotonic(), 0)):
+                    try:
+                        data, _ = key.fileobj.recvfrom(1024)
+                    except OSError:
+                        continue
+                    headers = self.parse_ssdp_headers(data)
+                    if self.is_camera(headers):
+                        elapsed_ms = (time.monotonic() - start_time) * 1000
+                        print(
+                            f"Camera found after {elapsed_ms:.0f} ms: {headers['LOCATION']}"
+                        )
+                        return headers
+        finally:
+            for sock in schedule:
+                selector.unregister(sock)
+                sock.close()
+            selector.close()
 
-            response = requests.get(location_url)
-            if response.status_code == 200:
-                xml_content = response.content
-                print("XML content fetched successfully!")
-                return xml_content
+    @staticmethod
+    def is_camera(headers: dict[str, str]) -> bool:
+        """
+        Whether SSDP headers (of a response or a NOTIFY) come from a Sony ScalarWebAPI device.
+        """
+        search_target = headers.get("ST", headers.get("NT", ""))
+        return "ScalarWebAPI" in search_target and bool(headers.get("LOCATION"))
 
-        print("Could not find a valid IP to connect with the camera.")
-        return None
+    @staticmethod
+    def parse_ssdp_headers(data: bytes) -> dict[str, str]:
+        """
+        Parses the headers of an SSDP message into a dict with upper case header names.
+        """
+        headers = {}
+        response_str = data.decode("utf-8", errors="replace")
+        for line in response_str.splitlines()[1:]:
+            name, separator, value = line.partition(":")
+            if separator:
+                headers[name.strip().upper()] = value.strip()
+        return headers
 
     def _get_assigned_ip(self) -> list[str]:
         """The assigned IP adress to the computer is needed in order to communicate with the Camera using SSDP M-Search"""
@@ -116,8 +241,1314 @@ class SSDPSearch:
             return None
 
 
+@dataclass
+class LiveviewFrame:
+    """
+    One packet of the Sony live view stream. For image packets data is the JPEG itself.
+    """
+
+    payload_type: int
+    sequence_number: int
+    timestamp: int
+    data: memoryview
+    # time.monotonic() when the packet was completely received, used for the latency of delivery
+    received_at: float = 0.0
+
+
+class LiveviewPacketParser:
+    """
+    Streaming parser for the framing of the Sony live view stream.
+    Every packet consists of an 8 byte common header, a 128 byte payload header and the payload
+    followed by padding:
+
+        common header:  start byte 0xFF | payload type (1) | sequence number (2) | timestamp (4)
+        payload header: start code 0x24356879 (4) | payload size (3) | padding size (1) | reserved (120)
+
+    The headers are read into a reusable buffer, the payload is read directly from the stream into
+    its own buffer and handed on as memoryview, so no frame is ever searched byte by byte.
+    No frame is copied either as long as the readinto of the stream writes into the given buffer,
+    like the http.client response of LiveviewBroadcaster.open_camera_stream does. The readinto of
+    urllib3 (the raw response of requests) reads into a new bytes object and copies that instead.
+    """
+
+    PAYLOAD_TYPE_JPEG = 0x01
+    PAYLOAD_TYPE_FRAME_INFO = 0x02
+
+    COMMON_HEADER = struct.Struct(">BBHI")
+    PAYLOAD_HEADER = struct.Struct(">4s3sB")
+    START_BYTE = 0xFF
+    START_CODE = b"\x24\x35\x68\x79"
+    HEADER_SIZE = 8 + 128
+
+    def __init__(self, stream):
+        # Any binary file-like object offering readinto, e.g. an http.client response
+        self.stream = stream
+        self._header = bytearray(self.HEADER_SIZE)
+        self._padding = bytearray(256)
+
+    def __iter__(self) -> Iterator[LiveviewFrame]:
+        header_view = memoryview(self._header)
+        padding_view = memoryview(self._padding)
+        while True:
+            if not self._read_exact(header_view):
+                return
+            payload_type, sequence_number, timestamp, payload_size, padding_size = (
+                self.parse_header(self._header)
+            )
+            payload = memoryview(bytearray(payload_size))
+            if not self._read_exact(payload):
+                return
+            if padding_size and not self._read_exact(padding_view[:padding_size]):
+                return
+
+            yield LiveviewFrame(
+                payload_type, sequence_number, timestamp, payload, time.monotonic()
+            )
+
+    @classmethod
+    def parse_header(cls, header) -> tuple[int, int, int, int, int]:
+        """
+        Parses the common and payload header of a packet and returns payload type,
+        sequence number, timestamp, payload size and padding size.
+        """
+        start_byte, payload_type, sequence_number, timestamp = (
+            cls.COMMON_HEADER.unpack_from(header, 0)
+        )
+        start_code, payload_size, padding_size = cls.PAYLOAD_HEADER.unpack_from(
+            header, 8
+        )
+        if start_byte != cls.START_BYTE or start_code != cls.START_CODE:
+            raise ValueError("Invalid live view packet header.")
+        return (
+            payload_type,
+            sequence_number,
+            timestamp,
+            int.from_bytes(payload_size, "big"),
+            padding_size,
+        )
+
+    def iter_jpeg_frames(self) -> Iterator[LiveviewFrame]:
+        """
+        Same as iterating the parser, but skips all packets not containing a JPEG image.
+        """
+        for frame in self:
+            if frame.payload_type == self.PAYLOAD_TYPE_JPEG:
+                yield frame
+
+    def _read_exact(self, view: memoryview) -> bool:
+        """
+        Fills the given view completely from the stream. Returns False if the stream ended before.
+        """
+        filled = 0
+        size = len(view)
+        while filled < size:
+            read = self.stream.readinto(view[filled:])
+            if not read:
+                return False
+            filled += read
+        return True
+
+
+class LiveviewSubscription:
+    """
+    Delivery state of one browser client watching the live view.
+    A client never queues frames: its slot is the newest frame of the broadcaster, every frame
+    published while the client was still sending (or waiting because of max_fps) is dropped.
+    """
+
+    def __init__(self, client: str, max_fps: float = None):
+        self.client = client
+        # Thumbnails ask for fewer frames, None sends every frame the client can keep up with
+        self.max_fps = max_fps
+        self.frame_id = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.latency_ms = None
+        self.max_latency_ms = 0.0
+        self._last_sent = 0.0
+
+    def delay(self) -> float:
+        """
+        Seconds to wait before the next frame may be sent to keep below max_fps.
+        """
+        if not self.max_fps:
+            return 0.0
+        return max(self._last_sent + 1 / self.max_fps - time.monotonic(), 0.0)
+
+    def accept(self, frame_id: int):
+        """
+        Takes the frame with the given id into the slot, all frames since the last one are dropped.
+        """
+        if self.frame_id:
+            self.frames_dropped += frame_id - self.frame_id - 1
+        self.frame_id = frame_id
+
+    def record_sent(self, frame: LiveviewFrame):
+        self._last_sent = time.monotonic()
+        self.frames_sent += 1
+        # End to end: from the packet being received from the camera until written to the client
+        self.latency_ms = (self._last_sent - frame.received_at) * 1000
+        self.max_latency_ms = max(self.max_latency_ms, self.latency_ms)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "client": self.client,
+            "max_fps": self.max_fps,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "latency_ms": self.latency_ms and round(self.latency_ms, 3),
+            "max_latency_ms": round(self.max_latency_ms, 3),
+        }
+
+
+class LiveviewBroadcaster:
+    """
+    Reads the live view stream of one camera in a background thread and publishes every
+    parsed JPEG frame to all subscribed browser clients.
+    The camera only accepts very few live view connections, therefore there is exactly one
+    broadcaster per live view URL. It is started by the first subscriber and torn down after
+    the last subscriber has left.
+    """
+
+    # Maximum time in seconds a subscriber waits for the next frame before giving up
+    FRAME_TIMEOUT = 10
+
+    _broadcasters: dict[str, "LiveviewBroadcaster"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, live_view_url: str):
+        self.live_view_url = live_view_url
+        self.status_code = None
+        self.error = None
+        self.frames_parsed = 0
+        self._frame = None
+        self._frame_id = 0
+        self._running = False
+        self._subscriptions: list[LiveviewSubscription] = []
+        self._camera_stream = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._read_stream, daemon=True)
+
+    @classmethod
+    def subscribe(
+        cls, live_view_url: str, subscription: LiveviewSubscription
+    ) -> "LiveviewBroadcaster":
+        """
+        Returns the running broadcaster for the given live view URL and registers the subscription
+        of the caller. The broadcaster is created and started if it does not exist yet.
+        """
+        with cls._registry_lock:
+            broadcaster = cls._broadcasters.get(live_view_url)
+            if broadcaster is None:
+                broadcaster = cls(live_view_url)
+                cls._broadcasters[live_view_url] = broadcaster
+                broadcaster._start()
+            broadcaster._subscriptions.append(subscription)
+            return broadcaster
+
+    @classmethod
+    def unsubscribe(
+        cls, broadcaster: "LiveviewBroadcaster", subscription: LiveviewSubscription
+    ):
+        """
+        Removes a subscription. The upstream connection is closed once nobody is watching anymore.
+        """
+        with cls._registry_lock:
+            broadcaster._subscriptions.remove(subscription)
+            if broadcaster._subscriptions:
+                return
+            if cls._broadcasters.get(broadcaster.live_view_url) is broadcaster:
+                del cls._broadcasters[broadcaster.live_view_url]
+        broadcaster._stop()
+
+    @classmethod
+    def all_stats(cls) -> list[dict[str, Any]]:
+        with cls._registry_lock:
+            return [broadcaster.stats() for broadcaster in cls._broadcasters.values()]
+
+    @classmethod
+    def find(cls, live_view_url: str) -> "LiveviewBroadcaster | None":
+        with cls._registry_lock:
+            return cls._broadcasters.get(live_view_url)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Counters of the broadcaster and the delivery to each of its clients.
+        """
+        return {
+            "live_view_url": self.live_view_url,
+            "frames_parsed": self.frames_parsed,
+            "clients": [subscription.stats() for subscription in self._subscriptions],
+        }
+
+    def wait_for_frame(
+        self, last_frame_id: int, timeout=None
+    ) -> tuple[LiveviewFrame | None, int]:
+        """
+        Blocks until a frame newer than last_frame_id is available and returns it together
+        with its id. Frames published in the meantime are skipped, a subscriber always gets
+        the latest one. Returns (None, last_frame_id) if the stream ended or timed out.
+        """
+        timeout = self.FRAME_TIMEOUT if timeout is None else timeout
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frame_id > last_frame_id or not self._running, timeout
+            )
+            if self._frame_id > last_frame_id:
+                return self._frame, self._frame_id
+            return None, last_frame_id
+
+    @staticmethod
+    def open_camera_stream(
+        live_view_url: str, timeout: float = None
+    ) -> http.client.HTTPResponse:
+        """
+        Sends the GET request for the live view stream and returns the response of the camera.
+        The stream is read with http.client instead of requests: its readinto removes a chunked
+        encoding and reads straight into the buffer of the caller, without copying the frame.
+        """
+        parsed_url = urlparse(live_view_url)
+        if parsed_url.scheme == "https":
+            connection_class = http.client.HTTPSConnection
+        else:
+            connection_class = http.client.HTTPConnection
+        connection = connection_class(
+            parsed_url.hostname, parsed_url.port, timeout=timeout
+        )
+        target = parsed_url.path or "/"
+        if parsed_url.query:
+            target += f"?{parsed_url.query}"
+        connection.request("GET", target)
+        return connection.getresponse()
+
+    def _start(self):
+        self._running = True
+        self._thread.start()
+
+    def _stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        # Closing the response unblocks the reader thread waiting for the next chunk
+        camera_stream = self._camera_stream
+        if camera_stream is not None:
+            camera_stream.close()
+
+    def _publish(self, frame: LiveviewFrame):
+        with self._condition:
+            self._frame = frame
+            self._frame_id += 1
+            self._condition.notify_all()
+
+    def _read_stream(self):
+        """
+        Runs in the background thread: fetches the live view stream from the camera and
+        publishes every complete JPEG frame until the last subscriber has left.
+        """
+        try:
+            camera_stream = self.open_camera_stream(
+                self.live_view_url, timeout=self.FRAME_TIMEOUT
+            )
+            self._camera_stream = camera_stream
+            self.status_code = camera_stream.status
+            if camera_stream.status != 200:
+                self.error = (
+                    f"Camera responded with status code {camera_stream.status}."
+                )
+                camera_stream.close()
+                return
+            if not self._running:
+                camera_stream.close()
+                return
+
+            # Frames are read from the socket directly into their own buffer
+            parser = LiveviewPacketParser(camera_stream)
+            for frame in parser.iter_jpeg_frames():
+                if not self._running:
+                    break
+                self.frames_parsed += 1
+                self._publish(frame)
+        except Exception as e:
+            if self._running:
+                self.error = str(e)
+                print(f"Exception occurred while reading live view stream: {e}")
+        finally:
+            # Wake up all subscribers, the stream has ended
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
+            with self._registry_lock:
+                if self._broadcasters.get(self.live_view_url) is self:
+                    del self._broadcasters[self.live_view_url]
+            print(f"Live view broadcaster stopped after {self.frames_parsed} frames.")
+
+
+class CameraRegistry:
+    """
+    Keeps the device descriptions of all found cameras in memory, keyed by the UUID of the camera.
+    Entries expire after the max-age announced by the camera via CACHE-CONTROL. A background
+    listener keeps the registry up to date from the ssdp:alive and ssdp:byebye NOTIFY messages
+    the cameras send to the SSDP multicast group.
+    """
+
+    # Used if the camera does not announce a max-age, UPnP requires at least 1800 seconds
+    DEFAULT_MAX_AGE = 1800
+    # Bytes of the device description fed to the pull parser at once
+    PARSE_CHUNK_SIZE = 4096
+
+    def __init__(self):
+        # uuid -> {"location": str, "device_description": bytes, "index": dict, "expires": float}
+        self._cameras: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._listener = None
+
+    @staticmethod
+    def parse_uuid(usn: str) -> str:
+        """
+        The USN looks like uuid:<id>::urn:schemas-sony-com:service:ScalarWebAPI:1, only the uuid identifies the camera.
+        """
+        return usn.split("::", 1)[0]
+
+    @classmethod
+    def parse_max_age(cls, cache_control: str) -> int:
+        for directive in cache_control.split(","):
+            name, _, value = directive.strip().partition("=")
+            if name.strip().lower() == "max-age" and value.strip().isdigit():
+                return int(value)
+        return cls.DEFAULT_MAX_AGE
+
+    def update(
+        self, usn: str, location: str, max_age: int, device_description: bytes = None
+    ):
+        """
+        Adds or refreshes a camera. Without device description the previously fetched one is kept.
+        """
+        uuid = self.parse_uuid(usn)
+        with self._lock:
+            camera = self._cameras.setdefault(uuid, {})
+            if camera.get("location") != location:
+                camera["device_description"] = None
+                camera["index"] = None
+            camera["location"] = location
+            camera["expires"] = time.monotonic() + max_age
+            if device_description is not None:
+                camera["device_description"] = device_description
+                # Parsed only once here, clients get the ready-to-use endpoints from the index
+                try:
+                    camera["index"] = self.parse_device_description(device_description)
+                except ElementTree.ParseError as e:
+                    print(f"Error at parsing device description of {location}: {e}")
+                    camera["index"] = None
+
+    def remove(self, usn: str):
+        with self._lock:
+            self._cameras.pop(self.parse_uuid(usn), None)
+
+    def needs_device_description(self, usn: str, location: str) -> bool:
+        with self._lock:
+            camera = self._cameras.get(self.parse_uuid(usn))
+            return (
+                camera is None
+                or camera.get("location") != location
+                or camera.get("device_description") is None
+            )
+
+    def get_cameras(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns a copy of all cameras which have not expired yet and whose device description is known.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for uuid in [u for u, c in self._cameras.items() if c["expires"] <= now]:
+                del self._cameras[uuid]
+            return {
+                uuid: dict(camera)
+                for uuid, camera in self._cameras.items()
+                if camera.get("device_description") is not None
+            }
+
+    def get_camera_index(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns the parsed device descriptions of all known cameras, keyed by camera UUID.
+        """
+        return {
+            uuid: camera["index"]
+            for uuid, camera in self.get_cameras().items()
+            if camera["index"] is not None
+        }
+
+    def resolve_endpoint(self, camera: str, service: str) -> str | None:
+        """
+        Returns the JSON-RPC endpoint of a service (camera, avContent, system, guide) of a known camera.
+        """
+        with self._lock:
+            entry = self._cameras.get(camera)
+            if not entry or not entry.get("index"):
+                return None
+            return entry["index"]["services"].get(service)
+
+    def find_camera(self, action_list_url: str) -> str | None:
+        """
+        Returns the UUID of the known camera offering the given service endpoint.
+        """
+        with self._lock:
+            for uuid, camera in self._cameras.items():
+                index = camera.get("index")
+                if index and action_list_url in index["services"].values():
+                    return uuid
+        return None
+
+    @staticmethod
+    def parse_device_description(device_description: bytes) -> dict[str, Any]:
+        """
+        Extracts the ScalarWebAPI information from a device description XML with a pull parser.
+        The document is fed in chunks and the events are handled after every chunk, every
+        element is removed from its parent once read. So only the currently open elements are
+        kept, never a DOM of the whole document.
+        The endpoint of each service is the action list URL followed by the service type.
+        """
+        index = {
+            "udn": None,
+            "friendly_name": None,
+            "model_name": None,
+            "version": None,
+            "liveview_url": None,
+            "services": {},
+        }
+        fields = {
+            "UDN": "udn",
+            "friendlyName": "friendly_name",
+            "modelName": "model_name",
+            "X_ScalarWebAPI_Version": "version",
+            "X_ScalarWebAPI_LiveView_URL": "liveview_url",
+        }
+        service_type = None
+        action_list_url = None
+
+        parser = ElementTree.XMLPullParser(events=("start", "end"))
+        # The elements from the root down to the one being parsed
+        open_elements = []
+
+        def handle_events():
+            nonlocal service_type, action_list_url
+            for event, element in parser.read_events():
+                if event == "start":
+                    open_elements.append(element)
+                    continue
+                open_elements.pop()
+                # Strip the namespace, e.g. {urn:schemas-sony-com:av}X_ScalarWebAPI_ServiceType
+                tag = element.tag.rsplit("}", 1)[-1]
+                text = (element.text or "").strip()
+                if tag in fields and index[fields[tag]] is None:
+                    index[fields[tag]] = text
+                elif tag == "X_ScalarWebAPI_ServiceType":
+                    service_type = text
+                elif tag == "X_ScalarWebAPI_ActionList_URL":
+                    action_list_url = text.rstrip("/")
+                elif tag == "X_ScalarWebAPI_Service":
+                    if service_type and action_list_url:
+                        index["services"][
+                            service_type
+                        ] = f"{action_list_url}/{service_type}"
+                    service_type = None
+                    action_list_url = None
+                # Read elements are dropped, their parent is still open
+                if open_elements:
+                    open_elements[-1].remove(element)
+
+        chunk_size = CameraRegistry.PARSE_CHUNK_SIZE
+        for offset in range(0, len(device_description), chunk_size):
+            parser.feed(device_description[offset : offset + chunk_size])
+            handle_events()
+        parser.close()
+        handle_events()
+        return index
+
+    def latest_device_description(self) -> bytes | None:
+        """
+        Returns the device description of the camera which announced itself most recently.
+        """
+        cameras = self.get_cameras()
+        if not cameras:
+            return None
+        latest = max(cameras.values(), key=lambda camera: camera["expires"])
+        return latest["device_description"]
+
+    def start_listener(self):
+        """
+        Starts the background thread listening for NOTIFY messages, if not running yet.
+        """
+        if self._listener is not None:
+            return
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            sock.bind(("", SSDPSearch.SSDP_MULTICAST_PORT))
+        except OSError as e:
+            print(f"Could not listen for SSDP NOTIFY messages: {e}")
+            sock.close()
+            return
+
+        # Join the multicast group on every interface, a camera announces itself only on its own network
+        group = socket.inet_aton(SSDPSearch.SSDP_MULTICAST_IP)
+        for ip in SSDPSearch()._get_assigned_ip() or ["0.0.0.0"]:
+            try:
+                sock.setsockopt(
+                    socket.IPPROTO_IP,
+                    socket.IP_ADD_MEMBERSHIP,
+                    group + socket.inet_aton(ip),
+                )
+            except OSError as e:
+                print(f"Could not join SSDP multicast group on {ip}: {e}")
+
+        print("Listening for SSDP NOTIFY messages...")
+        while True:
+            try:
+                data, _ = sock.recvfrom(2048)
+                self.handle_notify(data)
+            except Exception as e:
+                print(f"Error at handling SSDP NOTIFY message: {e}")
+
+    def handle_notify(self, data: bytes):
+        """
+        Updates the registry from one ssdp:alive or ssdp:byebye NOTIFY message.
+        """
+        if not data.startswith(b"NOTIFY"):
+            return
+        headers = SSDPSearch.parse_ssdp_headers(data)
+        usn = headers.get("USN")
+        if not usn or "ScalarWebAPI" not in headers.get("NT", ""):
+            return
+
+        if headers.get("NTS") == "ssdp:byebye":
+            print(f"Camera left the network: {usn}")
+            self.remove(usn)
+        elif headers.get("NTS") == "ssdp:alive" and headers.get("LOCATION"):
+            location = headers["LOCATION"]
+            max_age = self.parse_max_age(headers.get("CACHE-CONTROL", ""))
+            device_description = None
+            # The device description is only fetched for new cameras or if the location has changed
+            if self.needs_device_description(usn, location):
+                response = requests.get(location, timeout=5)
+                if response.status_code != 200:
+                    return
+                device_description = response.content
+                print(f"Camera announced itself: {location}")
+            self.update(usn, location, max_age, device_description)
+
+
+class CameraConnectionPool:
+    """
+    Keeps one requests session with keep-alive connections per camera, so that control requests
+    reuse an open TCP connection instead of connecting to the camera every time.
+    """
+
+    def __init__(self, pool_size: int = 4, timeout: float = 10):
+        # Maximum number of open connections per camera, the camera itself only handles a few
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._sessions: dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, url: str) -> requests.Session:
+        """
+        Returns the session of the camera (scheme, host and port) the URL points to.
+        """
+        parsed_url = urlparse(url)
+        key = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_size
+                )
+                session.mount(key, adapter)
+                self._sessions[key] = session
+            return session
+
+    def post(self, url: str, payload: dict, timeout: float = None) -> requests.Response:
+        timeout = self.timeout if timeout is None else timeout
+        return self.get_session(url).post(url, json=payload, timeout=timeout)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class CameraSession:
+    """
+    Everything the local service keeps for one camera: its live view URL and the pooled
+    connection to it. The live view stream state itself lives in the broadcaster of the URL.
+    """
+
+    def __init__(self, camera_id: str, connection_pool: CameraConnectionPool):
+        self.camera_id = camera_id
+        self.connection_pool = connection_pool
+        self.liveview_url = None
+        self.http_session = None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def post(self, url: str, payload: dict) -> requests.Response:
+        with self._lock:
+            self.requests += 1
+            if self.http_session is None:
+                self.http_session = self.connection_pool.get_session(url)
+            http_session = self.http_session
+        return http_session.post(
+            url, json=payload, timeout=self.connection_pool.timeout
+        )
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "camera": self.camera_id,
+            "liveview_url": self.liveview_url,
+            "requests": self.requests,
+        }
+
+
+class CameraSessionRegistry:
+    """
+    Thread-safe registry of the sessions of all cameras, keyed by camera UUID. Cameras which are
+    not in the CameraRegistry (e.g. addressed only by action_list_url) are keyed by host and port.
+    """
+
+    def __init__(self, connection_pool: CameraConnectionPool):
+        self.connection_pool = connection_pool
+        self._sessions: dict[str, CameraSession] = {}
+        # Clients not naming a camera for /liveview get the live view started most recently
+        self._latest_liveview = None
+        self._lock = threading.Lock()
+
+    def get(self, camera_id: str) -> CameraSession:
+        """
+        Returns the session of the camera, it is created on first use.
+        """
+        with self._lock:
+            session = self._sessions.get(camera_id)
+            if session is None:
+                session = CameraSession(camera_id, self.connection_pool)
+                self._sessions[camera_id] = session
+            return session
+
+    def set_liveview_url(self, session: CameraSession, liveview_url: str):
+        with self._lock:
+            session.liveview_url = liveview_url
+            self._latest_liveview = session.camera_id
+
+    def get_liveview_url(self, camera_id: str = None) -> str | None:
+        """
+        Returns the live view URL of the camera, or of the latest started live view without camera.
+        """
+        with self._lock:
+            session = self._sessions.get(camera_id or self._latest_liveview)
+            return session.liveview_url if session else None
+
+    def sessions(self) -> list[CameraSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+
+class CameraEventMonitor:
+    """
+    Runs one getEvent long-poll loop per camera and keeps the merged camera state in memory.
+    Browser clients read the state from here or get the changed fields pushed, instead of every
+    tab polling the camera itself. The loop runs while clients are subscribed or the state was
+    requested within IDLE_TIMEOUT seconds.
+    """
+
+    # getEvent versions tried in order, the first one the camera supports is kept
+    VERSIONS = ("1.1", "1.0")
+    # The camera answers a long poll after a change or latest after its own timeout
+    LONG_POLL_TIMEOUT = 60
+    IDLE_TIMEOUT = 60
+    RETRY_DELAY = 1
+    # JSON-RPC error codes of the camera for "No such method" and "Unsupported version"
+    UNSUPPORTED_ERRORS = (12, 14)
+
+    _monitors: dict[str, "CameraEventMonitor"] = {}
+    _registry_lock = threading.Lock()
+    # Called with the action list URL after every change of any camera, e.g. to invalidate caches
+    change_listeners: list = []
+
+    def __init__(self, action_list_url: str, connection_pool: CameraConnectionPool):
+        self.action_list_url = action_list_url
+        self.connection_pool = connection_pool
+        self.version = None
+        self.error = None
+        self.state: dict[str, Any] = {}
+        self.revision = 0
+        self._subscribers: list = []
+        self._last_access = time.monotonic()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._poll_events, daemon=True)
+
+    @classmethod
+    def get(
+        cls, action_list_url: str, connection_pool: CameraConnectionPool
+    ) -> "CameraEventMonitor":
+        """
+        Returns the monitor of the camera, it is created and started on first use.
+        """
+        with cls._registry_lock:
+            monitor = cls._monitors.get(action_list_url)
+            if monitor is None:
+                monitor = cls(action_list_url, connection_pool)
+                cls._monitors[action_list_url] = monitor
+                monitor._thread.start()
+            monitor._last_access = time.monotonic()
+            return monitor
+
+    def subscribe(self, callback=None):
+        """
+        Keeps the loop running for a client. The optional callback is invoked from the loop thread
+        after every change, e.g. to wake up an asyncio task.
+        """
+        with self._condition:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback=None):
+        with self._condition:
+            self._subscribers.remove(callback)
+            self._last_access = time.monotonic()
+
+    def snapshot(self) -> tuple[dict[str, Any], int]:
+        """
+        Returns a copy of the current state and its revision, without asking the camera.
+        """
+        with self._condition:
+            self._last_access = time.monotonic()
+            return dict(self.state), self.revision
+
+    def wait_for_change(
+        self, last_revision: int, timeout: float
+    ) -> tuple[dict[str, Any], int]:
+        """
+        Blocks until the state has changed since last_revision or the timeout has passed.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.revision > last_revision, timeout)
+            return dict(self.state), self.revision
+
+    @staticmethod
+    def diff(state: dict[str, Any], known: dict[str, Any]) -> dict[str, Any]:
+        """
+        Fields of state which differ from the ones a client already knows.
+        """
+        return {key: value for key, value in state.items() if known.get(key) != value}
+
+    @staticmethod
+    def parse_event(result: list) -> dict[str, Any]:
+        """
+        Turns the result of getEvent into fields keyed by their type, e.g. "cameraStatus".
+        An entry of the result is either empty, one object or a list of objects with a type.
+        Several objects of the same type (e.g. storageInformation) are kept together as list.
+        """
+        fields = {}
+        for entry in result:
+            if not entry:
+                continue
+            items = entry if isinstance(entry, list) else [entry]
+            grouped = {}
+            for item in items:
+                if isinstance(item, dict) and item.get("type"):
+                    grouped.setdefault(item["type"], []).append(item)
+            for field_type, values in grouped.items():
+                fields[field_type] = values[0] if len(values) == 1 else values
+        return fields
+
+    def _is_idle(self) -> bool:
+        with self._condition:
+            return (
+                not self._subscribers
+                and time.monotonic() - self._last_access > self.IDLE_TIMEOUT
+            )
+
+    def _call_get_event(self, long_poll: bool) -> list:
+        """
+        Calls getEvent with the first supported version and returns its result.
+        """
+        versions = [self.version] if self.version else self.VERSIONS
+        for version in versions:
+            payload = {
+                "method": "getEvent",
+                "params": [long_poll],
+                "id": 1,
+                "version": version,
+            }
+            response = self.connection_pool.post(
+                self.action_list_url, payload, timeout=self.LONG_POLL_TIMEOUT
+            ).json()
+            error = response.get("error")
+            if error and error[0] in self.UNSUPPORTED_ERRORS and not self.version:
+                continue
+            if error:
+                raise RuntimeError(f"getEvent failed: {error}")
+            self.version = version
+            return response.get("result", [])
+        raise RuntimeError("getEvent is not supported by the camera.")
+
+    def _poll_events(self):
+        # The first call returns the complete state immediately, then every call waits for a change
+        long_poll = False
+        while not self._is_idle():
+            try:
+                changes = self.parse_event(self._call_get_event(long_poll))
+                long_poll = True
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                print(f"Error at polling camera events: {e}")
+                time.sleep(self.RETRY_DELAY)
+                continue
+
+            with self._condition:
+                changes = self.diff(changes, self.state)
+                if not changes:
+                    continue
+                self.state.update(changes)
+                self.revision += 1
+                self._condition.notify_all()
+                callbacks = [callback for callback in self._subscribers if callback]
+            for callback in callbacks:
+                callback()
+            for listener in self.change_listeners:
+                listener(self.action_list_url)
+
+        with self._registry_lock:
+            if self._monitors.get(self.action_list_url) is self:
+                del self._monitors[self.action_list_url]
+        print(f"Stopped polling events of {self.action_list_url}.")
+
+
+class CameraResponseCache:
+    """
+    Opt-in cache for the responses of JSON-RPC methods which only read camera data, keyed by
+    (action list URL, method, params, version). Entries expire after the TTL of their method and
+    the least recently used entries are evicted above max_entries. Every setter (set*, act*,
+    start*, stop*) and every state change reported by getEvent clears all entries of the camera.
+    """
+
+    # Seconds a response stays valid, exact method names first, otherwise the longest prefix
+    DEFAULT_TTLS = {
+        "getVersions": 3600,
+        "getMethodTypes": 3600,
+        "getApplicationInfo": 3600,
+        "getStorageInformation": 10,
+        "getSupported": 60,
+        "getAvailable": 5,
+    }
+    WRITE_PREFIXES = ("set", "act", "start", "stop")
+
+    def __init__(self, ttls: dict[str, float] = None, max_entries: int = 256):
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # key -> (expires, response data)
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        # Bumped on every invalidation, responses requested before must not be stored anymore
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _camera(action_list_url: str) -> str:
+        # All services of a camera share its state, so they are invalidated together
+        return urlparse(action_list_url).netloc
+
+    def ttl_for(self, method: str) -> float | None:
+        if method in self.ttls:
+            return self.ttls[method]
+        prefixes = [prefix for prefix in self.ttls if method.startswith(prefix)]
+        if not prefixes:
+            return None
+        return self.ttls[max(prefixes, key=len)]
+
+    def is_write(self, method: str) -> bool:
+        return method.startswith(self.WRITE_PREFIXES)
+
+    def _key(self, action_list_url: str, payload: dict) -> tuple:
+        return (
+            action_list_url,
+            payload.get("method"),
+            json.dumps(payload.get("params"), sort_keys=True),
+            payload.get("version"),
+        )
+
+    def lookup(self, action_list_url: str, payload: dict) -> tuple[Any, int]:
+        """
+        Returns the cached response (None on a miss or for methods which are not cached) and
+        the generation of the camera, which has to be passed to store afterwards.
+        A setter invalidates the camera right away, before it is sent to the camera.
+        """
+        method = payload.get("method") or ""
+        camera = self._camera(action_list_url)
+        if self.is_write(method):
+            self.invalidate(action_list_url)
+        with self._lock:
+            generation = self._generations.get(camera, 0)
+            if self.is_write(method) or self.ttl_for(method) is None:
+                return None, generation
+            key = self._key(action_list_url, payload)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None, generation
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # The JSON-RPC id of the answer has to match the id of the current request
+        return dict(entry[1], id=payload.get("id")), generation
+
+    def store(
+        self,
+        action_list_url: str,
+        payload: dict,
+        generation: int,
+        response: Any,
+        status_code: int,
+    ):
+        """
+        Caches a successful response of a cacheable method. Setters invalidate the camera again,
+        so that reads answered while the setter was running are dropped as well.
+        """
+        method = payload.get("method") or ""
+        if self.is_write(method):
+            self.invalidate(action_list_url)
+            return
+        ttl = self.ttl_for(method)
+        if (
+            ttl is None
+            or status_code != 200
+            or not isinstance(response, dict)
+            or "error" in response
+        ):
+            return
+        with self._lock:
+            if self._generations.get(self._camera(action_list_url), 0) != generation:
+                return
+            key = self._key(action_list_url, payload)
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, action_list_url: str):
+        """
+        Removes all cached responses of the camera the URL belongs to.
+        """
+        camera = self._camera(action_list_url)
+        with self._lock:
+            self._generations[camera] = self._generations.get(camera, 0) + 1
+            self.invalidations += 1
+            for key in [key for key in self._entries if self._camera(key[0]) == camera]:
+                del self._entries[key]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+class LocalService:
+    """
+    Request logic shared by both server front ends, BrowserCommunicationHandler (threading) and
+    AsyncLocalService (asyncio). It holds the found cameras, the session and pooled connection of
+    every camera and the optional response cache, the front ends only speak HTTP to the browser.
+    Invalid requests raise ValueError with the message for the client.
+    """
+
+    # Interval in seconds of comments keeping idle event streams open
+    EVENT_STREAM_KEEP_ALIVE = 15
+
+    def __init__(self, pool_size: int = 4, discovery_timeout: float = 8):
+        # Default of /discover, a client may pass a shorter or longer ?timeout=<seconds>
+        self.discovery_timeout = discovery_timeout
+        self.camera_registry = CameraRegistry()
+        self.connection_pool = CameraConnectionPool(pool_size=pool_size)
+        self.camera_sessions = CameraSessionRegistry(self.connection_pool)
+        # Opt-in, see enable_response_cache
+        self.response_cache: CameraResponseCache | None = None
+
+    def enable_response_cache(self, cache: CameraResponseCache = None):
+        """
+        Answers idempotent camera methods from a CameraResponseCache from now on.
+        """
+        cache = cache or CameraResponseCache()
+        self.response_cache = cache
+        CameraEventMonitor.change_listeners.append(cache.invalidate)
+
+    def discover(self, query: str) -> dict[str, Any]:
+        """
+        Answers /discover from the registry, unless the client forces a new search with ?refresh=1.
+        Blocks during the SSDP search, at most ?timeout=<seconds> or the discovery_timeout.
+        """
+        parameters = parse_qs(query)
+        refresh = parameters.get("refresh", ["0"])[0] == "1"
+        timeout = self.discovery_timeout
+        if "timeout" in parameters:
+            try:
+                timeout = float(parameters["timeout"][0])
+            except ValueError:
+                timeout = 0
+            if not timeout > 0:
+                raise ValueError("Invalid timeout.")
+        device_description = None
+        if not refresh:
+            device_description = self.camera_registry.latest_device_description()
+        if device_description is None:
+            # Perform SSDP discovery
+            searcher = SSDPSearch(timeout=timeout, registry=self.camera_registry)
+            device_description = searcher.retrieve_device_descriptions()
+        if device_description is None:
+            return {"error": "Device description fetching failed."}
+        return {"device_description": device_description.decode("utf-8")}
+
+    def cameras(self) -> dict[str, Any]:
+        # Parsed device descriptions with the service endpoints of all known cameras
+        return {"cameras": self.camera_registry.get_camera_index()}
+
+    def cache_stats(self) -> dict[str, Any]:
+        # Hit and miss counters of the response cache of /camera_control
+        response = {"enabled": self.response_cache is not None}
+        if self.response_cache is not None:
+            response.update(self.response_cache.stats())
+        return response
+
+    def session_stats(self, broadcaster_class) -> dict[str, Any]:
+        """
+        Live view URL, request count and stream state of every camera session.
+        """
+        stats = []
+        for session in self.camera_sessions.sessions():
+            session_stats = session.stats()
+            broadcaster = broadcaster_class.find(session.liveview_url)
+            session_stats["liveview"] = broadcaster.stats() if broadcaster else None
+            stats.append(session_stats)
+        return {"sessions": stats}
+
+    @staticmethod
+    def parse_max_fps(query: str) -> float | None:
+        """
+        Reads the optional max_fps query parameter of /liveview, raises ValueError if invalid.
+        """
+        max_fps = parse_qs(query).get("max_fps")
+        if not max_fps:
+            return None
+        max_fps = float(max_fps[0])
+        if not max_fps > 0:
+            raise ValueError("max_fps must be positive.")
+        return max_fps
+
+    def resolve_liveview(self, query: str) -> tuple[str, float | None]:
+        """
+        Returns the live view URL and max_fps of a /liveview request, ?camera=<id> selects the camera.
+        """
+        camera = parse_qs(query).get("camera", [None])[0]
+        liveview_url = self.camera_sessions.get_liveview_url(camera)
+        if not liveview_url:
+            print("Live view URL not set. Cannot start streaming.")
+            raise ValueError("Live view URL not set. Start live view first.")
+        try:
+            max_fps = self.parse_max_fps(query)
+        except ValueError:
+            raise ValueError("Invalid max_fps.")
+        return liveview_url, max_fps
+
+    def resolve_action_list_url(self, data: dict) -> str | None:
+        """
+        Returns the action list URL of a control request, either given directly or by camera and service.
+        """
+        action_list_url = data.get("action_list_url")
+        # Instead of the full URL a client may name a known camera and one of its services
+        if not action_list_url and data.get("camera"):
+            action_list_url = self.camera_registry.resolve_endpoint(
+                data["camera"], data.get("service", "camera")
+            )
+        return action_list_url
+
+    def get_event_monitor(self, query: str) -> CameraEventMonitor:
+        """
+        Returns the event monitor of the camera named by camera (and service) or action_list_url in the query.
+        """
+        data = {name: values[0] for name, values in parse_qs(query).items()}
+        action_list_url = self.resolve_action_list_url(data)
+        if not action_list_url:
+            raise ValueError("Unknown camera. Pass camera or action_list_url.")
+        # The long poll itself runs in the thread of the monitor, for both front ends
+        return CameraEventMonitor.get(action_list_url, self.connection_pool)
+
+    @staticmethod
+    def camera_state(monitor: CameraEventMonitor) -> dict[str, Any]:
+        state, revision = monitor.snapshot()
+        return {"state": state, "revision": revision, "error": monitor.error}
+
+    def get_camera_session(
+        self, camera: str | None, action_list_url: str
+    ) -> CameraSession:
+        """
+        Returns the session of the camera named in the request, or of the camera the URL belongs to.
+        """
+        camera_id = (
+            camera
+            or self.camera_registry.find_camera(action_list_url)
+            or urlparse(action_list_url).netloc
+        )
+        return self.camera_sessions.get(camera_id)
+
+    def parse_control_request(self, data: dict) -> tuple[str, dict, str, str]:
+        """
+        Returns action list URL, JSON-RPC payload, action and camera of a /camera_control request.
+        """
+        action_list_url = self.resolve_action_list_url(data)
+        # This is the actual json object required for the api request to the camera
+        payload = data.get("payload")
+        if not action_list_url or not payload:
+            raise ValueError("Invalid request data.")
+        return action_list_url, payload, data.get("action"), data.get("camera")
+
+    def prepare_batch(self, data: dict) -> list[tuple | dict]:
+        """
+        Every entry of a batch may name its own camera/service or action_list_url, otherwise the
+        ones of the batch are used. Returns per entry either the arguments for forwarding it or,
+        if the entry is invalid, its error result.
+        """
+        entries = data.get("requests")
+        if not isinstance(entries, list) or not entries:
+            raise ValueError("Invalid request data.")
+        requests_data = []
+        for entry in entries:
+            action_list_url = self.resolve_action_list_url(
+                entry
+            ) or self.resolve_action_list_url(data)
+            payload = entry.get("payload")
+            if not action_list_url or not payload:
+                requests_data.append(
+                    {"error": "Invalid request data.", "status_code": 400}
+                )
+                continue
+            requests_data.append(
+                (
+                    action_list_url,
+                    payload,
+                    entry.get("action"),
+                    entry.get("camera") or data.get("camera"),
+                )
+            )
+        return requests_data
+
+    @staticmethod
+    def batch_result(response: Any, status_code: int) -> dict[str, Any]:
+        return {"response": response, "status_code": status_code}
+
+    @staticmethod
+    def batch_error(error: Exception) -> dict[str, Any]:
+        return {
+            "error": "Internal server error.",
+            "details": str(error),
+            "status_code": 500,
+        }
+
+    def prepare_forward(
+        self, action_list_url: str, payload: dict, camera: str = None
+    ) -> tuple[CameraSession, Any, int]:
+        """
+        First half of forwarding a JSON-RPC request: returns the session of the camera, the cached
+        response (None if the camera has to be asked) and the cache generation for finish_forward.
+        """
+        session = self.get_camera_session(camera, action_list_url)
+        if self.response_cache is None:
+            return session, None, 0
+        cached_response, generation = self.response_cache.lookup(
+            action_list_url, payload
+        )
+        return session, cached_response, generation
+
+    def finish_forward(
+        self,
+        session: CameraSession,
+        action_list_url: str,
+        payload: dict,
+        action: str,
+        generation: int,
+        camera_response_data: Any,
+        status_code: int,
+    ):
+        """
+        Second half of forwarding: caches the response of the camera and remembers the live view URL.
+        """
+        if self.response_cache is not None:
+            self.response_cache.store(
+                action_list_url, payload, generation, camera_response_data, status_code
+            )
+        self._store_liveview_url(session, action, camera_response_data)
+
+    def forward(
+        self, action_list_url: str, payload: dict, action: str = None, camera=None
+    ) -> tuple[Any, int]:
+        """
+        Forwards one JSON-RPC request to the camera over the pooled connection of its session
+        and returns the response data and status code of the camera.
+        """
+        session, cached_response, generation = self.prepare_forward(
+            action_list_url, payload, camera
+        )
+        if cached_response is not None:
+            return cached_response, 200
+        camera_response = session.post(action_list_url, payload)
+        camera_response_data = camera_response.json()
+        self.finish_forward(
+            session,
+            action_list_url,
+            payload,
+            action,
+            generation,
+            camera_response_data,
+            camera_response.status_code,
+        )
+        return camera_response_data, camera_response.status_code
+
+    def _store_liveview_url(
+        self, session: CameraSession, action: str, camera_response_data: Any
+    ):
+        """
+        Remembers the live view URL in the session if the live view stream was started by the request.
+        """
+        if action == "startLiveview" or action == "startLiveviewWithSize":
+            liveview_urls = camera_response_data.get("result", [])
+            if liveview_urls:
+                # Extract the liveview url from the camera response
+                self.camera_sessions.set_liveview_url(session, liveview_urls[0])
+                print(f"Live view URL of {session.camera_id}: {liveview_urls[0]}")
+            else:
+                print("No live view URL found in the response.")
+
+
 class BrowserCommunicationHandler(BaseHTTPRequestHandler):
-    liveview_url = None
+    # Replaced by run_server, e.g. with a service using another pool size
+    service = LocalService()
 
     def _set_headers(self, status_code=200, content_type="application/json"):
         """
@@ -135,143 +1566,218 @@ class BrowserCommunicationHandler(BaseHTTPRequestHandler):
         self._set_headers(status_code)
         self.wfile.write(json.dumps(response).encode("utf-8"))
 
-    def _handle_liveview_stream(self, live_view_url, boundary="--myboundary"):
+    def _write_vectored(self, buffers: tuple):
         """
-        Fetches the live view stream from the camera and relays it to the client's browser
-        by converting the camera's stream into an MJPEG (Motion JPEG) stream using the
-        multipart/x-mixed-replace MIME type.
+        Sends all buffers to the browser with as few system calls as possible (sendmsg)
+        and without joining them into a new bytes object first.
         """
+        if not hasattr(self.connection, "sendmsg"):
+            # E.g. on Windows, the socket writer of the handler is unbuffered
+            for buffer in buffers:
+                self.wfile.write(buffer)
+            return
+        views = [memoryview(buffer).cast("B") for buffer in buffers]
+        while views:
+            sent = self.connection.sendmsg(views)
+            # A partial send continues with the rest of the buffer it stopped in
+            while sent:
+                if sent >= len(views[0]):
+                    sent -= len(views.pop(0))
+                else:
+                    views[0] = views[0][sent:]
+                    sent = 0
+
+    def _handle_liveview_stream(
+        self, live_view_url, boundary="--myboundary", max_fps=None
+    ):
+        """
+        Relays the live view stream of the camera to the client's browser as an MJPEG
+        (Motion JPEG) stream using the multipart/x-mixed-replace MIME type.
+        The camera stream itself is read by a shared LiveviewBroadcaster, so every browser
+        client watching the same camera is served from one upstream connection. A slow client
+        only drops frames, it never holds up the camera stream or the other clients.
+        """
+        subscription = LiveviewSubscription(
+            f"{self.client_address[0]}:{self.client_address[1]}", max_fps
+        )
+        broadcaster = LiveviewBroadcaster.subscribe(live_view_url, subscription)
         try:
-            camera_stream = requests.get(live_view_url, stream=True)
+            # Wait for the first frame, so that a failing camera can still be reported properly
+            frame, frame_id = broadcaster.wait_for_frame(0)
+            if frame is None:
+                status_code = broadcaster.status_code or 500
+                response = {
+                    "error": "Error streaming live view.",
+                    "details": broadcaster.error or "No frame received from camera.",
+                }
+                self._send_json_response(response, status_code=status_code)
+                print(
+                    f"Failed to connect to live view stream. Status Code: {status_code}"
+                )
+                return
 
-            if camera_stream.status_code == 200:
-                content_type = f"multipart/x-mixed-replace; boundary={boundary}"
-                self._set_headers(camera_stream.status_code, content_type)
-                print(f"Streaming live view with Content-Type: {content_type}")
+            content_type = f"multipart/x-mixed-replace; boundary={boundary}"
+            self._set_headers(200, content_type)
+            print(f"Streaming live view with Content-Type: {content_type}")
 
-                # Initializes a byte buffer to accumulate incoming data chunks from the camera's stream
-                buffer = b""
+            # The boundary string indicates the start of a new JPEG frame in the multipart stream.
+            part_header = f"{boundary}\r\nContent-Type: image/jpeg\r\n\r\n".encode()
+            while frame is not None:
+                subscription.accept(frame_id)
+                try:
+                    # Boundary, headers and JPEG go out in one vectored write
+                    self._write_vectored((part_header, frame.data, b"\r\n"))
+                except (BrokenPipeError, ConnectionResetError):
+                    print("Error at streaming chunks or client quitted.")
+                    return
+                subscription.record_sent(frame)
+                time.sleep(subscription.delay())
+                # Blocks until the broadcaster published a newer frame than the one just sent
+                frame, frame_id = broadcaster.wait_for_frame(frame_id)
+        finally:
+            LiveviewBroadcaster.unsubscribe(broadcaster, subscription)
 
-                # Iterates over the streamed response in chunks of 1024 bytes.
-                for chunk in camera_stream.iter_content(chunk_size=1024):
-                    if not chunk:
-                        continue
-                    buffer += chunk
-
-                    while True:
-                        # The find method searches for a specified substring within a string (or a sequence
-                        # of bytes within a bytes object) and returns the lowest index where the substring is found.
-                        # -1 if not found
-                        start_jpeg = buffer.find(b"\xff\xd8")  # Start of JPEG
-                        end_jpeg = buffer.find(b"\xff\xd9")  # End of JPEG
-
-                        if (
-                            start_jpeg != -1
-                            and end_jpeg != -1
-                            and end_jpeg > start_jpeg
-                        ):
-                            # Slice the image out of the buffer
-                            # +2 since the start/end marker are 2 bytes long "0xFF 0xD8" and "0xFF 0xD9"
-                            jpg = buffer[start_jpeg : end_jpeg + 2]
-                            # Remove the extracted image from buffer
-                            buffer = buffer[end_jpeg + 2 :]
-
-                            try:
-                                # Sends data to the browser over the established HTTP connection.
-                                # The boundary string indicates the start of a new JPEG frame in the multipart stream.
-                                self.wfile.write(f"{boundary}\r\n".encode())
-                                self.wfile.write(
-                                    "Content-Type: image/jpeg\r\n\r\n".encode()
-                                )
-                                self.wfile.write(jpg)
-                                self.wfile.write("\r\n".encode())
-                                self.wfile.flush()
-                            except BrokenPipeError:
-                                print("Error at streaming chunks or client quitted.")
-                                return
-                        else:
-                            break
-            else:
-                self._set_headers(camera_stream.status_code)
-                print(
-                    f"Failed to connect to live view stream. Status Code: {camera_stream.status_code}"
+    def _handle_event_stream(self, monitor: CameraEventMonitor):
+        """
+        Pushes the camera state to the browser as Server-Sent Events: first all known fields,
+        afterwards only the fields which have changed.
+        """
+        self._set_headers(200, "text/event-stream")
+        known = {}
+        revision = -1
+        monitor.subscribe()
+        try:
+            while True:
+                state, revision = monitor.wait_for_change(
+                    revision, self.service.EVENT_STREAM_KEEP_ALIVE
                 )
-        except Exception as e:
-            response = {"error": "Error streaming live view.", "details": str(e)}
-            self._send_json_response(response, status_code=500)
-            print(f"Exception occurred while streaming live view: {e}")
+                changes = CameraEventMonitor.diff(state, known)
+                if changes:
+                    self.wfile.write(f"data: {json.dumps(changes)}\n\n".encode())
+                    known.update(changes)
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            print("Event stream client quitted.")
+        finally:
+            monitor.unsubscribe()
 
     def do_GET(self):
         """
         Handles GET requests.
         """
-        path = urlparse(self.path).path
+        parsed_url = urlparse(self.path)
+        path = parsed_url.path
+        service = self.service
 
         # Prompt for camera discorvering at the beginning
         if path == "/discover":
-            # Perform SSDP discovery
-            searcher = SSDPSearch()
-            device_description = searcher.retrieve_device_descriptions()
-            if device_description is None:
-                response = {"error": "Device description fetching failed."}
-            else:
-                device_description_str = device_description.decode("utf-8")
-                response = {"device_description": device_description_str}
-
+            try:
+                response = service.discover(parsed_url.query)
+            except ValueError as e:
+                self._send_json_response({"error": str(e)}, status_code=400)
+                return
             self._send_json_response(response)
 
-        # For request for liveview streaming
+        elif path == "/cameras":
+            self._send_json_response(service.cameras())
+
+        # For request for liveview streaming, ?camera=<id> selects the camera
         elif path == "/liveview":
-            if not BrowserCommunicationHandler.liveview_url:
-                response = {"error": "Live view URL not set. Start live view first."}
-                self._send_json_response(response, status_code=400)
-                print("Live view URL not set. Cannot start streaming.")
+            try:
+                liveview_url, max_fps = service.resolve_liveview(parsed_url.query)
+            except ValueError as e:
+                self._send_json_response({"error": str(e)}, status_code=400)
                 return
+            self._handle_liveview_stream(liveview_url, max_fps=max_fps)
+
+        elif path == "/sessions":
+            self._send_json_response(service.session_stats(LiveviewBroadcaster))
+
+        # Dropped frames and latency of every live view client
+        elif path == "/liveview/stats":
+            self._send_json_response({"broadcasters": LiveviewBroadcaster.all_stats()})
 
-            self._handle_liveview_stream(BrowserCommunicationHandler.liveview_url)
+        elif path == "/camera_control/cache":
+            self._send_json_response(service.cache_stats())
+
+        # Cached camera state (kept up to date by one getEvent long poll per camera),
+        # or its changes pushed as Server-Sent Events
+        elif path in ("/camera_state", "/camera_events"):
+            try:
+                monitor = service.get_event_monitor(parsed_url.query)
+            except ValueError as e:
+                self._send_json_response({"error": str(e)}, status_code=400)
+                return
+            if path == "/camera_state":
+                self._send_json_response(service.camera_state(monitor))
+            else:
+                self._handle_event_stream(monitor)
         else:
             self.send_error(404, "Local Service not found.")
 
+    def _handle_batch(self, data: dict):
+        """
+        Forwards a list of JSON-RPC requests to the camera and answers with all results at once.
+        The requests run in parallel over the pooled connections, unless the batch is "ordered",
+        then they are sent one after another in the given order.
+        """
+        service = self.service
+        try:
+            requests_data = service.prepare_batch(data)
+        except ValueError as e:
+            self._send_json_response({"error": str(e)}, status_code=400)
+            return
+
+        def forward(request_data: tuple | dict) -> dict:
+            if isinstance(request_data, dict):
+                return request_data
+            try:
+                return service.batch_result(*service.forward(*request_data))
+            except Exception as e:
+                return service.batch_error(e)
+
+        if data.get("ordered"):
+            results = [forward(request_data) for request_data in requests_data]
+        else:
+            pool_size = service.connection_pool.pool_size
+            with ThreadPoolExecutor(
+                max_workers=min(pool_size, len(requests_data))
+            ) as executor:
+                results = list(executor.map(forward, requests_data))
+        self._send_json_response({"results": results})
+
     def do_POST(self):
         """
         Handles POST requests.
         """
-        if self.path == "/camera_control":
-            content_length = int(self.headers["Content-Length"])
+        if self.path in ("/camera_control", "/camera_control/batch"):
+            try:
+                content_length = int(self.headers["Content-Length"])
+                if content_length < 0:
+                    raise ValueError("Negative Content-Length.")
+            except (TypeError, ValueError):
+                self._send_json_response({"error": "Bad request."}, status_code=400)
+                return
             post_data = self.rfile.read(content_length)
             try:
                 # Parse the JSON data sent from the client
                 data = json.loads(post_data.decode("utf-8"))
                 print(f"Data from Server received in Local Service: {data}")
-                action_list_url = data.get("action_list_url")
-                # This is the actual json object required for the api request to the camera
-                payload = data.get("payload")
-                action = data.get("action")
-
-                if not action_list_url or not payload:
-                    response = {"error": "Invalid request data."}
-                    self._send_json_response(response, status_code=400)
+                if self.path == "/camera_control/batch":
+                    self._handle_batch(data)
+                    return
+
+                try:
+                    request_data = self.service.parse_control_request(data)
+                except ValueError as e:
+                    self._send_json_response({"error": str(e)}, status_code=400)
                     return
 
                 # Forward the request to the camera
-                camera_response = requests.post(action_list_url, json=payload)
-                camera_response_data = camera_response.json()
-
-                # If liveview stream is requested
-                if action == "startLiveview" or action == "startLiveviewWithSize":
-                    liveview_urls = camera_response_data.get("result", [])
-                    if liveview_urls:
-                        # Extract the liveview url from the camera response
-                        BrowserCommunicationHandler.liveview_url = liveview_urls[0]
-                        print(
-                            f"Live view URL: {BrowserCommunicationHandler.liveview_url}"
-                        )
-                    else:
-                        print("No live view URL found in the response.")
+                camera_response_data, status_code = self.service.forward(*request_data)
                 # Notify the client browser with the camera status (should be success)
-                self._send_json_response(
-                    camera_response_data, status_code=camera_response.status_code
-                )
+                self._send_json_response(camera_response_data, status_code=status_code)
 
             except Exception as e:
                 response = {"error": "Internal server error.", "details": str(e)}
@@ -292,15 +1798,663 @@ class BrowserCommunicationHandler(BaseHTTPRequestHandler):
             self.send_error(403, "Forbidden Origin")
 
 
-def run_server():
-    server_address = ("", 8001)
+class _ChunkedStreamReader:
+    """
+    Removes the chunked transfer encoding of a streamed camera response.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader):
+        self._reader = reader
+        self._remaining = 0
+
+    async def readexactly(self, size: int) -> bytes:
+        parts = []
+        while size:
+            if not self._remaining:
+                line = await self._reader.readline()
+                self._remaining = int(line.split(b";", 1)[0], 16)
+                if not self._remaining:
+                    raise asyncio.IncompleteReadError(b"".join(parts), None)
+            part = await self._reader.readexactly(min(size, self._remaining))
+            parts.append(part)
+            size -= len(part)
+            self._remaining -= len(part)
+            if not self._remaining:
+                # Every chunk is terminated by CRLF
+                await self._reader.readexactly(2)
+        return b"".join(parts)
+
+
+class AsyncCameraClient:
+    """
+    Minimal non-blocking HTTP/1.1 client used by the asyncio server to talk to the camera.
+    Like CameraConnectionPool, connections to each camera are kept alive and reused.
+    """
+
+    def __init__(self, pool_size: int = 4, timeout: float = 10):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        # (host, port) -> idle keep-alive connections
+        self._idle: dict[tuple[str, int], list] = {}
+
+    @staticmethod
+    def _split_url(url: str) -> tuple[str, int, str]:
+        parsed_url = urlparse(url)
+        target = parsed_url.path or "/"
+        if parsed_url.query:
+            target += f"?{parsed_url.query}"
+        return parsed_url.hostname, parsed_url.port or 80, target
+
+    @staticmethod
+    async def read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+        """
+        Reads HTTP header lines up to the empty line, header names are lower case.
+        """
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> tuple[int, dict]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by camera.")
+        status_code = int(status_line.split()[1])
+        return status_code, await self.read_headers(reader)
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: dict) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0], 16)
+                if not size:
+                    await self.read_headers(reader)  # Trailer
+                    return b"".join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+        if "content-length" in headers:
+            return await reader.readexactly(int(headers["content-length"]))
+        # Without length the body ends with the connection, which can not be reused then
+        headers["connection"] = "close"
+        return await reader.read()
+
+    async def _acquire(self, host: str, port: int) -> tuple[Any, Any, bool]:
+        idle = self._idle.get((host, port), [])
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), self.timeout
+        )
+        return reader, writer, False
+
+    def _release(self, host: str, port: int, reader, writer):
+        idle = self._idle.setdefault((host, port), [])
+        if len(idle) < self.pool_size:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def post_json(self, url: str, payload: Any) -> tuple[int, Any]:
+        """
+        Sends a JSON-RPC request and returns status code and decoded JSON response of the camera.
+        """
+        host, port, target = self._split_url(url)
+        body = json.dumps(payload).encode("utf-8")
+        request = (
+            f"POST {target} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("latin-1") + body
+
+        # A reused connection may have been closed by the camera meanwhile, then it is retried once
+        for attempt in range(2):
+            reader, writer, reused = await self._acquire(host, port)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_code, headers = await asyncio.wait_for(
+                    self._read_head(reader), self.timeout
+                )
+                data = await asyncio.wait_for(
+                    self._read_body(reader, headers), self.timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self._release(host, port, reader, writer)
+            return status_code, json.loads(data)
+
+    async def open_stream(self, url: str) -> tuple[int, Any, Any]:
+        """
+        Opens a dedicated connection for a streamed GET request. Returns the status code, a reader
+        positioned at the start of the body and the writer to close the connection with.
+        """
+        host, port, target = self._split_url(url)
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), self.timeout
+        )
+        writer.write(
+            (
+                f"GET {target} HTTP/1.1\r\n"
+                f"Host: {host}:{port}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+        )
+        await writer.drain()
+        status_code, headers = await asyncio.wait_for(
+            self._read_head(reader), self.timeout
+        )
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            return status_code, _ChunkedStreamReader(reader), writer
+        return status_code, reader, writer
+
+
+class AsyncLiveviewBroadcaster:
+    """
+    Counterpart of LiveviewBroadcaster for the asyncio server: one task per live view URL reads
+    the camera stream and publishes every frame to all subscribed clients.
+    """
+
+    FRAME_TIMEOUT = LiveviewBroadcaster.FRAME_TIMEOUT
+
+    _broadcasters: dict[str, "AsyncLiveviewBroadcaster"] = {}
+
+    def __init__(self, live_view_url: str, client: AsyncCameraClient):
+        self.live_view_url = live_view_url
+        self.client = client
+        self.status_code = None
+        self.error = None
+        self.frames_parsed = 0
+        self._frame = None
+        self._frame_id = 0
+        self._running = True
+        self._subscriptions: list[LiveviewSubscription] = []
+        self._condition = asyncio.Condition()
+        self._task = None
+
+    @classmethod
+    def subscribe(
+        cls,
+        live_view_url: str,
+        client: AsyncCameraClient,
+        subscription: LiveviewSubscription,
+    ) -> "AsyncLiveviewBroadcaster":
+        broadcaster = cls._broadcasters.get(live_view_url)
+        if broadcaster is None:
+            broadcaster = cls(live_view_url, client)
+            cls._broadcasters[live_view_url] = broadcaster
+            broadcaster._task = asyncio.create_task(broadcaster._read_stream())
+        broadcaster._subscriptions.append(subscription)
+        return broadcaster
+
+    @classmethod
+    def unsubscribe(
+        cls, broadcaster: "AsyncLiveviewBroadcaster", subscription: LiveviewSubscription
+    ):
+        broadcaster._subscriptions.remove(subscription)
+        if broadcaster._subscriptions:
+            return
+        if cls._broadcasters.get(broadcaster.live_view_url) is broadcaster:
+            del cls._broadcasters[broadcaster.live_view_url]
+        broadcaster._running = False
+        broadcaster._task.cancel()
+
+    @classmethod
+    def all_stats(cls) -> list[dict[str, Any]]:
+        return [broadcaster.stats() for broadcaster in cls._broadcasters.values()]
+
+    @classmethod
+    def find(cls, live_view_url: str) -> "AsyncLiveviewBroadcaster | None":
+        return cls._broadcasters.get(live_view_url)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "live_view_url": self.live_view_url,
+            "frames_parsed": self.frames_parsed,
+            "clients": [subscription.stats() for subscription in self._subscriptions],
+        }
+
+    async def wait_for_frame(
+        self, last_frame_id: int, timeout=None
+    ) -> tuple[LiveviewFrame | None, int]:
+        """
+        Same as LiveviewBroadcaster.wait_for_frame, without blocking the event loop.
+        """
+        timeout = self.FRAME_TIMEOUT if timeout is None else timeout
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(
+                        lambda: self._frame_id > last_frame_id or not self._running
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                pass
+            if self._frame_id > last_frame_id:
+                return self._frame, self._frame_id
+            return None, last_frame_id
+
+    async def _read_stream(self):
+        writer = None
+        try:
+            self.status_code, reader, writer = await self.client.open_stream(
+                self.live_view_url
+            )
+            if self.status_code != 200:
+                self.error = f"Camera responded with status code {self.status_code}."
+                return
+
+            while self._running:
+                header = await reader.readexactly(LiveviewPacketParser.HEADER_SIZE)
+                payload_type, sequence_number, timestamp, payload_size, padding_size = (
+                    LiveviewPacketParser.parse_header(header)
+                )
+                payload = await reader.readexactly(payload_size)
+                if padding_size:
+                    await reader.readexactly(padding_size)
+                if payload_type != LiveviewPacketParser.PAYLOAD_TYPE_JPEG:
+                    continue
+                self.frames_parsed += 1
+                async with self._condition:
+                    self._frame = LiveviewFrame(
+                        payload_type,
+                        sequence_number,
+                        timestamp,
+                        memoryview(payload),
+                        time.monotonic(),
+                    )
+                    self._frame_id += 1
+                    self._condition.notify_all()
+        except (asyncio.CancelledError, asyncio.IncompleteReadError):
+            # Cancelled after the last subscriber has left or the camera ended the stream
+            pass
+        except Exception as e:
+            self.error = str(e)
+            print(f"Exception occurred while reading live view stream: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+            self._running = False
+            if AsyncLiveviewBroadcaster._broadcasters.get(self.live_view_url) is self:
+                del AsyncLiveviewBroadcaster._broadcasters[self.live_view_url]
+            print(f"Live view broadcaster stopped after {self.frames_parsed} frames.")
+        async with self._condition:
+            self._condition.notify_all()
+
+
+class AsyncLocalService:
+    """
+    Alternative server core on a single asyncio event loop, serving the same endpoints as
+    BrowserCommunicationHandler with the same LocalService. Live view clients and control
+    requests do not occupy a thread each, all camera I/O is non-blocking. Only the SSDP search
+    runs in a worker thread.
+    """
+
+    def __init__(self, service: LocalService, port: int = 8001):
+        self.service = service
+        self.port = port
+        # Same number of connections per camera as the pool of the threading server
+        self.client = AsyncCameraClient(pool_size=service.connection_pool.pool_size)
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self._handle_connection, "", self.port)
+        print(f"Local service (asyncio) running on port {self.port}...")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            headers = await AsyncCameraClient.read_headers(reader)
+            try:
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                content_length = int(headers.get("content-length", 0))
+                if content_length < 0:
+                    raise ValueError("Negative Content-Length.")
+            except ValueError:
+                # Malformed request line or Content-Length, like BaseHTTPRequestHandler does
+                await self._send_json_response(
+                    writer, {"error": "Bad request."}, status_code=400
+                )
+                return
+            body = await reader.readexactly(content_length)
+            parsed_url = urlparse(target)
+
+            if method == "GET":
+                await self._do_get(parsed_url, writer)
+            elif method == "POST":
+                await self._do_post(parsed_url.path, body, writer)
+            elif method == "OPTIONS":
+                await self._do_options(headers, writer)
+            else:
+                await self._send_json_response(
+                    writer, {"error": "Unsupported method."}, status_code=501
+                )
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            print(f"Exception occurred while handling request: {e}")
+        finally:
+            writer.close()
+
+    async def _send_head(
+        self, writer, status_code=200, content_type="application/json", headers=None
+    ):
+        """
+        Writes status line and headers, the connection is closed after every response.
+        """
+        lines = [
+            f"HTTP/1.1 {status_code} {HTTPStatus(status_code).phrase}",
+            f"Content-type: {content_type}",
+            "Connection: close",
+        ]
+        headers = {"Access-Control-Allow-Origin": "*"} if headers is None else headers
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_json_response(self, writer, response: Any, status_code=200):
+        await self._send_head(writer, status_code)
+        writer.write(json.dumps(response).encode("utf-8"))
+        await writer.drain()
+
+    async def _do_get(self, parsed_url, writer):
+        path = parsed_url.path
+        service = self.service
+
+        if path == "/discover":
+            # The SSDP search blocks on its sockets, so it runs in a worker thread
+            try:
+                response = await asyncio.to_thread(service.discover, parsed_url.query)
+            except ValueError as e:
+                await self._send_json_response(
+                    writer, {"error": str(e)}, status_code=400
+                )
+                return
+            await self._send_json_response(writer, response)
+
+        elif path == "/cameras":
+            await self._send_json_response(writer, service.cameras())
+
+        elif path == "/liveview":
+            try:
+                liveview_url, max_fps = service.resolve_liveview(parsed_url.query)
+            except ValueError as e:
+                await self._send_json_response(
+                    writer, {"error": str(e)}, status_code=400
+                )
+                return
+            await self._handle_liveview_stream(writer, liveview_url, max_fps=max_fps)
+
+        elif path == "/sessions":
+            await self._send_json_response(
+                writer, service.session_stats(AsyncLiveviewBroadcaster)
+            )
+
+        elif path == "/liveview/stats":
+            await self._send_json_response(
+                writer, {"broadcasters": AsyncLiveviewBroadcaster.all_stats()}
+            )
+
+        elif path == "/camera_control/cache":
+            await self._send_json_response(writer, service.cache_stats())
+
+        elif path in ("/camera_state", "/camera_events"):
+            try:
+                monitor = service.get_event_monitor(parsed_url.query)
+            except ValueError as e:
+                await self._send_json_response(
+                    writer, {"error": str(e)}, status_code=400
+                )
+                return
+            if path == "/camera_state":
+                await self._send_json_response(writer, service.camera_state(monitor))
+            else:
+                await self._handle_event_stream(writer, monitor)
+        else:
+            await self._send_json_response(
+                writer, {"error": "Local Service not found."}, status_code=404
+            )
+
+    async def _handle_liveview_stream(
+        self, writer, live_view_url, boundary="--myboundary", max_fps=None
+    ):
+        host, port = writer.get_extra_info("peername")[:2]
+        subscription = LiveviewSubscription(f"{host}:{port}", max_fps)
+        broadcaster = AsyncLiveviewBroadcaster.subscribe(
+            live_view_url, self.client, subscription
+        )
+        try:
+            frame, frame_id = await broadcaster.wait_for_frame(0)
+            if frame is None:
+                response = {
+                    "error": "Error streaming live view.",
+                    "details": broadcaster.error or "No frame received from camera.",
+                }
+                await self._send_json_response(
+                    writer, response, status_code=broadcaster.status_code or 500
+                )
+                return
+
+            await self._send_head(
+                writer, 200, f"multipart/x-mixed-replace; boundary={boundary}"
+            )
+            part_header = f"{boundary}\r\nContent-Type: image/jpeg\r\n\r\n".encode()
+            while frame is not None:
+                subscription.accept(frame_id)
+                writer.writelines((part_header, frame.data, b"\r\n"))
+                # Only this client waits for its socket, the broadcaster keeps reading meanwhile
+                await writer.drain()
+                subscription.record_sent(frame)
+                await asyncio.sleep(subscription.delay())
+                frame, frame_id = await broadcaster.wait_for_frame(frame_id)
+        finally:
+            AsyncLiveviewBroadcaster.unsubscribe(broadcaster, subscription)
+
+    async def _handle_event_stream(self, writer, monitor: CameraEventMonitor):
+        """
+        Same as BrowserCommunicationHandler._handle_event_stream, the monitor wakes this task up
+        through the event loop instead of a waiting thread.
+        """
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def notify():
+            loop.call_soon_threadsafe(changed.set)
+
+        await self._send_head(writer, 200, "text/event-stream")
+        known = {}
+        monitor.subscribe(notify)
+        try:
+            while True:
+                changed.clear()
+                state, _ = monitor.snapshot()
+                changes = CameraEventMonitor.diff(state, known)
+                if changes:
+                    writer.write(f"data: {json.dumps(changes)}\n\n".encode())
+                    known.update(changes)
+                await writer.drain()
+                try:
+                    await asyncio.wait_for(
+                        changed.wait(), self.service.EVENT_STREAM_KEEP_ALIVE
+                    )
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+        finally:
+            monitor.unsubscribe(notify)
+
+    async def _forward_to_camera(
+        self, action_list_url: str, payload: dict, action: str = None, camera=None
+    ) -> tuple[Any, int]:
+        """
+        Same as LocalService.forward, the request to the camera does not block the event loop.
+        The connections themselves are pooled by AsyncCameraClient, keyed by host and port.
+        """
+        session, cached_response, generation = self.service.prepare_forward(
+            action_list_url, payload, camera
+        )
+        session.count_request()
+        if cached_response is not None:
+            return cached_response, 200
+
+        status_code, camera_response_data = await self.client.post_json(
+            action_list_url, payload
+        )
+        self.service.finish_forward(
+            session,
+            action_list_url,
+            payload,
+            action,
+            generation,
+            camera_response_data,
+            status_code,
+        )
+        return camera_response_data, status_code
+
+    async def _do_post(self, path: str, body: bytes, writer):
+        if path not in ("/camera_control", "/camera_control/batch"):
+            await self._send_json_response(
+                writer, {"error": "Local Service not found."}, status_code=404
+            )
+            return
+        try:
+            data = json.loads(body.decode("utf-8"))
+            if path == "/camera_control/batch":
+                await self._handle_batch(data, writer)
+                return
+
+            try:
+                request_data = self.service.parse_control_request(data)
+            except ValueError as e:
+                await self._send_json_response(
+                    writer, {"error": str(e)}, status_code=400
+                )
+                return
+            camera_response_data, status_code = await self._forward_to_camera(
+                *request_data
+            )
+            await self._send_json_response(
+                writer, camera_response_data, status_code=status_code
+            )
+        except Exception as e:
+            response = {"error": "Internal server error.", "details": str(e)}
+            await self._send_json_response(writer, response, status_code=500)
+
+    async def _handle_batch(self, data: dict, writer):
+        """
+        Same as BrowserCommunicationHandler._handle_batch, the requests run as concurrent tasks.
+        """
+        service = self.service
+        try:
+            requests_data = service.prepare_batch(data)
+        except ValueError as e:
+            await self._send_json_response(writer, {"error": str(e)}, status_code=400)
+            return
+        semaphore = asyncio.Semaphore(self.client.pool_size)
+
+        async def forward(request_data: tuple | dict) -> dict:
+            if isinstance(request_data, dict):
+                return request_data
+            try:
+                async with semaphore:
+                    return service.batch_result(
+                        *await self._forward_to_camera(*request_data)
+                    )
+            except Exception as e:
+                return service.batch_error(e)
+
+        if data.get("ordered"):
+            results = [await forward(request_data) for request_data in requests_data]
+        else:
+            results = await asyncio.gather(
+                *(forward(request_data) for request_data in requests_data)
+            )
+        await self._send_json_response(writer, {"results": list(results)})
+
+    async def _do_options(self, headers: dict, writer):
+        origin = headers.get("origin")
+        if origin and origin.startswith("http://127.0.0.1:8000"):
+            await self._send_head(
+                writer,
+                200,
+                "text/plain",
+                {
+                    "Access-Control-Allow-Origin": origin,
+                    "Access-Control-Allow-Methods": "POST, OPTIONS, GET",
+                    "Access-Control-Allow-Headers": "Content-Type",
+                },
+            )
+            await writer.drain()
+        else:
+            await self._send_json_response(
+                writer, {"error": "Forbidden Origin"}, status_code=403
+            )
+
+
+def run_server(port: int = 8001, service: LocalService = None):
+    if service is not None:
+        BrowserCommunicationHandler.service = service
+    server_address = ("", port)
     httpd = ThreadingHTTPServer(server_address, BrowserCommunicationHandler)
-    print("Local service running on port 8001...")
+    BrowserCommunicationHandler.service.camera_registry.start_listener()
+    print(f"Local service running on port {port}...")
     httpd.serve_forever()
 
 
+def run_async_server(port: int = 8001, service: LocalService = None):
+    service = service or BrowserCommunicationHandler.service
+    service.camera_registry.start_listener()
+    asyncio.run(AsyncLocalService(service, port=port).serve_forever())
+
+
 if __name__ == "__main__":
-    server_thread = threading.Thread(target=run_server)
+    parser = argparse.ArgumentParser(
+        description="Local service relaying requests from the browser to the camera."
+    )
+    parser.add_argument(
+        "--server",
+        choices=["threading", "asyncio"],
+        default="threading",
+        help="threading: one thread per connection, asyncio: single event loop",
+    )
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="answer idempotent camera methods (getVersions, getAvailable*, ...) from a cache",
+    )
+    parser.add_argument(
+        "--discovery-timeout",
+        type=float,
+        default=8,
+        help="seconds /discover searches for the camera, including its device description",
+    )
+    args = parser.parse_args()
+    service = LocalService(discovery_timeout=args.discovery_timeout)
+    if args.cache:
+        service.enable_response_cache()
+
+    target = run_async_server if args.server == "asyncio" else run_server
+    server_thread = threading.Thread(target=target, args=(args.port, service))
     server_thread.daemon = True
     server_thread.start()
 
@@ -0,0 +1,383 @@
+import argparse
+import json
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from camera_search import LiveviewPacketParser, SSDPSearch
+
+
+def build_liveview_header(
+    payload_size: int, sequence_number: int, timestamp: int, padding_size: int = 0
+) -> bytes:
+    """
+    Builds common header and payload header of one image packet of the Sony live view stream.
+    """
+    common_header = LiveviewPacketParser.COMMON_HEADER.pack(
+        LiveviewPacketParser.START_BYTE,
+        LiveviewPacketParser.PAYLOAD_TYPE_JPEG,
+        sequence_number & 0xFFFF,
+        timestamp & 0xFFFFFFFF,
+    )
+    payload_header = LiveviewPacketParser.PAYLOAD_HEADER.pack(
+        LiveviewPacketParser.START_CODE, payload_size.to_bytes(3, "big"), padding_size
+    ).ljust(128, b"\x00")
+    return common_header + payload_header
+
+
+def build_liveview_packet(
+    jpeg: bytes, sequence_number: int, timestamp: int, padding_size: int = 0
+) -> bytes:
+    """
+    Builds one image packet of the Sony live view stream around the given JPEG data.
+    """
+    header = build_liveview_header(len(jpeg), sequence_number, timestamp, padding_size)
+    return header + jpeg + bytes(padding_size)
+
+
+def build_fake_jpeg(size: int) -> bytes:
+    """
+    Returns JPEG-like data of the given size: start and end marker around zero bytes.
+    """
+    return b"\xff\xd8" + bytes(max(size - 4, 0)) + b"\xff\xd9"
+
+
+DEVICE_DESCRIPTION = """<?xml version="1.0"?>
+<root xmlns="urn:schemas-upnp-org:device-1-0">
+  <specVersion><major>1</major><minor>0</minor></specVersion>
+  <device>
+    <deviceType>urn:schemas-upnp-org:device:Basic:1</deviceType>
+    <friendlyName>{friendly_name}</friendlyName>
+    <manufacturer>Sony Corporation</manufacturer>
+    <modelName>SonyImagingDevice</modelName>
+    <UDN>uuid:{uuid}</UDN>
+    <av:X_ScalarWebAPI_DeviceInfo xmlns:av="urn:schemas-sony-com:av">
+      <av:X_ScalarWebAPI_Version>1.0</av:X_ScalarWebAPI_Version>
+      <av:X_ScalarWebAPI_ServiceList>
+{services}
+      </av:X_ScalarWebAPI_ServiceList>
+      <av:X_ScalarWebAPI_LiveView_URL>{liveview_url}</av:X_ScalarWebAPI_LiveView_URL>
+    </av:X_ScalarWebAPI_DeviceInfo>
+  </device>
+</root>
+"""
+
+SERVICE_DESCRIPTION = """        <av:X_ScalarWebAPI_Service>
+          <av:X_ScalarWebAPI_ServiceType>{service}</av:X_ScalarWebAPI_ServiceType>
+          <av:X_ScalarWebAPI_ActionList_URL>{action_list_url}</av:X_ScalarWebAPI_ActionList_URL>
+          <av:X_ScalarWebAPI_AccessType />
+        </av:X_ScalarWebAPI_Service>"""
+
+
+class _FakeCameraHandler(BaseHTTPRequestHandler):
+    """
+    HTTP side of the fake camera: device description, JSON-RPC services and live view stream.
+    """
+
+    # Keep-alive needs HTTP/1.1, the camera supports it as well
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, with Nagle every reused connection waits for the delayed ACK
+    disable_nagle_algorithm = True
+    camera: "FakeCamera" = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_body(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/dd.xml":
+            if self.camera.latency:
+                time.sleep(self.camera.latency)
+            self._send_body(
+                self.camera.device_description().encode("utf-8"), "text/xml"
+            )
+        elif self.path == "/liveview/liveviewstream":
+            self._stream_liveview()
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.camera.latency:
+            time.sleep(self.camera.latency)
+        response = self.camera.handle_rpc(request)
+        response["id"] = request.get("id", 1)
+        self._send_body(json.dumps(response).encode("utf-8"), "application/json")
+
+    def _stream_liveview(self):
+        # The live view stream has no length, it ends when the connection is closed
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        camera = self.camera
+        jpeg = camera.jpeg
+        sequence_number = 0
+        next_frame = time.monotonic()
+        camera.liveview_connections += 1
+        try:
+            while camera.running and (
+                camera.frame_count is None or sequence_number < camera.frame_count
+            ):
+                # Header and JPEG are sent separately, the frame is not copied into a packet
+                self.wfile.write(
+                    build_liveview_header(
+                        len(jpeg), sequence_number, int(time.monotonic() * 1000)
+                    )
+                )
+                self.wfile.write(jpeg)
+                camera.frames_sent += 1
+                sequence_number += 1
+                next_frame += 1 / camera.fps
+                time.sleep(max(next_frame - time.monotonic(), 0))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            camera.liveview_connections -= 1
+
+
+class FakeCamera:
+    """
+    Stand-in for a Sony camera for measurements without a real camera on Wi-Fi.
+    It answers SSDP M-SEARCH requests, serves its device description and the JSON-RPC services
+    (with configurable latency, getEvent long poll included) and streams correctly framed live
+    view packets at the configured fps and frame size.
+
+    By default everything listens on loopback ports chosen by the OS, an SSDPSearch is pointed
+    at the responder with SSDP_MULTICAST_IP/SSDP_MULTICAST_PORT = camera.ssdp_address.
+    With multicast=True the responder joins the real SSDP group on the given host instead.
+    """
+
+    SERVICES = ("guide", "camera", "system", "avContent")
+    # The real camera answers a getEvent long poll latest after this many seconds
+    LONG_POLL_TIMEOUT = 30
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        latency: float = 0.0,
+        fps: int = 30,
+        frame_size: int = 100_000,
+        multicast: bool = False,
+        friendly_name: str = "Fake ILCE",
+        frame_count: int = None,
+    ):
+        self.host = host
+        self.latency = latency
+        self.fps = fps
+        self.frame_size = frame_size
+        # Built once, every frame of the live view stream sends the same image
+        self.jpeg = build_fake_jpeg(frame_size)
+        # The live view stream ends after this many frames, None streams until stopped
+        self.frame_count = frame_count
+        self.multicast = multicast
+        self.friendly_name = friendly_name
+        self.uuid = str(uuid.uuid4())
+        self.running = False
+        self.liveview_connections = 0
+        self.frames_sent = 0
+        self.ssdp_requests = 0
+        # type -> field, as reported by getEvent
+        self.state = {
+            "cameraStatus": {"type": "cameraStatus", "cameraStatus": "IDLE"},
+            "isoSpeedRate": {"type": "isoSpeedRate", "currentIsoSpeedRate": "AUTO"},
+        }
+        self.revision = 0
+        self._condition = threading.Condition()
+
+        handler = type("FakeCameraHandler", (_FakeCameraHandler,), {"camera": self})
+        self._http_server = ThreadingHTTPServer((host, 0), handler)
+        self._http_server.daemon_threads = True
+        self._ssdp_socket = socket.socket(
+            socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP
+        )
+        self._ssdp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if multicast:
+            self._ssdp_socket.bind(("", SSDPSearch.SSDP_MULTICAST_PORT))
+            self._ssdp_socket.setsockopt(
+                socket.IPPROTO_IP,
+                socket.IP_ADD_MEMBERSHIP,
+                socket.inet_aton(SSDPSearch.SSDP_MULTICAST_IP) + socket.inet_aton(host),
+            )
+        else:
+            self._ssdp_socket.bind((host, 0))
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._http_server.server_address[1]}"
+
+    @property
+    def action_list_url(self) -> str:
+        return f"{self.base_url}/sony"
+
+    @property
+    def location(self) -> str:
+        return f"{self.base_url}/dd.xml"
+
+    @property
+    def liveview_url(self) -> str:
+        return f"{self.base_url}/liveview/liveviewstream"
+
+    @property
+    def ssdp_address(self) -> tuple[str, int]:
+        if self.multicast:
+            return SSDPSearch.SSDP_MULTICAST_IP, SSDPSearch.SSDP_MULTICAST_PORT
+        return self._ssdp_socket.getsockname()[:2]
+
+    def endpoint(self, service: str = "camera") -> str:
+        return f"{self.action_list_url}/{service}"
+
+    def start(self) -> "FakeCamera":
+        self.running = True
+        threading.Thread(target=self._http_server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._answer_searches, daemon=True).start()
+        return self
+
+    def stop(self):
+        started = self.running
+        self.running = False
+        with self._condition:
+            self._condition.notify_all()
+        # shutdown waits for serve_forever, which only runs after start
+        if started:
+            self._http_server.shutdown()
+        self._http_server.server_close()
+        self._ssdp_socket.close()
+
+    def __enter__(self) -> "FakeCamera":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def device_description(self) -> str:
+        services = "\n".join(
+            SERVICE_DESCRIPTION.format(
+                service=service, action_list_url=self.action_list_url
+            )
+            for service in self.SERVICES
+        )
+        return DEVICE_DESCRIPTION.format(
+            friendly_name=self.friendly_name,
+            uuid=self.uuid,
+            services=services,
+            liveview_url=self.liveview_url,
+        )
+
+    def ssdp_headers(self) -> str:
+        return (
+            "CACHE-CONTROL: max-age=1800\r\n"
+            "EXT:\r\n"
+            f"LOCATION: {self.location}\r\n"
+            "SERVER: UPnP/1.0 SonyImagingDevice/1.0\r\n"
+            f"USN: uuid:{self.uuid}::{SSDPSearch.SEARCH_TARGET}\r\n"
+        )
+
+    def notify_message(self, alive: bool = True) -> bytes:
+        """
+        NOTIFY message the camera multicasts when it joins (ssdp:alive) or leaves (ssdp:byebye).
+        """
+        return (
+            "NOTIFY * HTTP/1.1\r\n"
+            f"HOST: {SSDPSearch.SSDP_MULTICAST_IP}:{SSDPSearch.SSDP_MULTICAST_PORT}\r\n"
+            f"NT: {SSDPSearch.SEARCH_TARGET}\r\n"
+            f"NTS: {'ssdp:alive' if alive else 'ssdp:byebye'}\r\n"
+            + self.ssdp_headers()
+            + "\r\n"
+        ).encode("utf-8")
+
+    def set_state(self, field_type: str, field: dict):
+        """
+        Changes a field of the camera state, pending getEvent long polls return right away.
+        """
+        with self._condition:
+            self.state[field_type] = dict(field, type=field_type)
+            self.revision += 1
+            self._condition.notify_all()
+
+    def handle_rpc(self, request: dict) -> dict:
+        method = request.get("method", "")
+        params = request.get("params") or []
+        if method == "getVersions":
+            return {"result": [["1.0", "1.1"]]}
+        if method == "getApplicationInfo":
+            return {"result": ["Fake Camera", "2.1.4"]}
+        if method == "getEvent":
+            if request.get("version") not in ("1.0", "1.1"):
+                return {"error": [14, "Unsupported Version"]}
+            return {"result": self._get_event(bool(params and params[0]))}
+        if method in ("startLiveview", "startLiveviewWithSize"):
+            return {"result": [self.liveview_url]}
+        if method == "setIsoSpeedRate" and params:
+            self.set_state("isoSpeedRate", {"currentIsoSpeedRate": params[0]})
+        return {"result": [0]}
+
+    def _get_event(self, long_poll: bool) -> list:
+        with self._condition:
+            if long_poll:
+                revision = self.revision
+                self._condition.wait_for(
+                    lambda: self.revision != revision or not self.running,
+                    self.LONG_POLL_TIMEOUT,
+                )
+            return list(self.state.values())
+
+    def _answer_searches(self):
+        while self.running:
+            try:
+                data, address = self._ssdp_socket.recvfrom(2048)
+            except OSError:
+                return
+            if not data.startswith(b"M-SEARCH"):
+                continue
+            headers = SSDPSearch.parse_ssdp_headers(data)
+            if headers.get("ST") not in (SSDPSearch.SEARCH_TARGET, "ssdp:all"):
+                continue
+            self.ssdp_requests += 1
+            response = (
+                "HTTP/1.1 200 OK\r\n"
+                + self.ssdp_headers()
+                + f"ST: {SSDPSearch.SEARCH_TARGET}\r\n\r\n"
+            )
+            self._ssdp_socket.sendto(response.encode("utf-8"), address)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Sony camera for local tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--frame-size", type=int, default=100_000)
+    parser.add_argument(
+        "--multicast",
+        action="store_true",
+        help="answer M-SEARCH requests on the real SSDP multicast group",
+    )
+    args = parser.parse_args()
+
+    camera = FakeCamera(
+        args.host, args.latency, args.fps, args.frame_size, args.multicast
+    ).start()
+    print(f"Fake camera running, device description at {camera.location}")
+    print(
+        f"SSDP responder listening on {camera.ssdp_address[0]}:{camera.ssdp_address[1]}"
+    )
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Shutting down fake camera.")
+        camera.stop()
+
+
+if __name__ == "__main__":
+    main()
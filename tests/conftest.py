@@ -0,0 +1,97 @@
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+# The modules live in the repository root, next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera_search import (  # noqa: E402
+    AsyncLocalService,
+    BrowserCommunicationHandler,
+    LocalService,
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError(f"Nothing is listening on port {port}.")
+
+
+class RunningService:
+    def __init__(self, service: LocalService, mode: str, url: str):
+        self.service = service
+        self.mode = mode
+        self.url = url
+
+
+def _run_threading(service: LocalService):
+    handler = type(
+        "BrowserCommunicationHandler",
+        (BrowserCommunicationHandler,),
+        {"service": service},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+
+    return f"http://127.0.0.1:{server.server_address[1]}", stop
+
+
+def _run_asyncio(service: LocalService):
+    port = _free_port()
+    loop = asyncio.new_event_loop()
+
+    def serve():
+        try:
+            loop.run_until_complete(AsyncLocalService(service, port).serve_forever())
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    _wait_for_port(port)
+
+    def stop():
+        def cancel():
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+
+        loop.call_soon_threadsafe(cancel)
+        thread.join(5)
+
+    return f"http://127.0.0.1:{port}", stop
+
+
+@pytest.fixture(params=["threading", "asyncio"])
+def local_service(request):
+    """
+    A LocalService of its own behind the threading or the asyncio front end, on a loopback port.
+    """
+    service = LocalService()
+    run = _run_threading if request.param == "threading" else _run_asyncio
+    url, stop = run(service)
+    yield RunningService(service, request.param, url)
+    stop()
+    service.connection_pool.close()
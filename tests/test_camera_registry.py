@@ -0,0 +1,43 @@
+import pytest
+
+from camera_search import CameraRegistry
+from fake_camera import FakeCamera
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_device_description_is_parsed_in_chunks(monkeypatch, chunk_size):
+    monkeypatch.setattr(CameraRegistry, "PARSE_CHUNK_SIZE", chunk_size)
+    camera = FakeCamera()
+    try:
+        index = CameraRegistry.parse_device_description(
+            camera.device_description().encode("utf-8")
+        )
+    finally:
+        camera.stop()
+    assert index == {
+        "udn": f"uuid:{camera.uuid}",
+        "friendly_name": "Fake ILCE",
+        "model_name": "SonyImagingDevice",
+        "version": "1.0",
+        "liveview_url": camera.liveview_url,
+        "services": {
+            service: camera.endpoint(service) for service in FakeCamera.SERVICES
+        },
+    }
+
+
+def test_registry_resolves_endpoints():
+    camera = FakeCamera()
+    try:
+        registry = CameraRegistry()
+        registry.update(
+            f"uuid:{camera.uuid}::urn:schemas-sony-com:service:ScalarWebAPI:1",
+            camera.location,
+            1800,
+            camera.device_description().encode("utf-8"),
+        )
+    finally:
+        camera.stop()
+    uuid = f"uuid:{camera.uuid}"
+    assert registry.resolve_endpoint(uuid, "avContent") == camera.endpoint("avContent")
+    assert registry.find_camera(camera.endpoint("camera")) == uuid
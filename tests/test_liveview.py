@@ -0,0 +1,99 @@
+import io
+import threading
+import tracemalloc
+
+import pytest
+
+from camera_search import (
+    LiveviewBroadcaster,
+    LiveviewPacketParser,
+    LiveviewSubscription,
+)
+from fake_camera import FakeCamera, build_fake_jpeg, build_liveview_packet
+
+FRAME_COUNT = 100
+
+
+def _watch(broadcaster: LiveviewBroadcaster, received: list):
+    frame_id = 0
+    while True:
+        frame, frame_id = broadcaster.wait_for_frame(frame_id, timeout=5)
+        if frame is None:
+            return
+        received.append(frame.sequence_number)
+
+
+@pytest.mark.parametrize("client_count", [1, 10])
+def test_clients_share_one_upstream_connection(client_count):
+    with FakeCamera(fps=200, frame_count=FRAME_COUNT) as camera:
+        subscriptions = [
+            LiveviewSubscription(f"client-{i}") for i in range(client_count)
+        ]
+        broadcasters = [
+            LiveviewBroadcaster.subscribe(camera.liveview_url, subscription)
+            for subscription in subscriptions
+        ]
+        broadcaster = broadcasters[0]
+        assert all(other is broadcaster for other in broadcasters)
+
+        received = [[] for _ in subscriptions]
+        threads = [
+            threading.Thread(target=_watch, args=(broadcaster, frames))
+            for frames in received
+        ]
+        for thread in threads:
+            thread.start()
+        assert broadcaster.wait_for_frame(0)[0] is not None
+        assert camera.liveview_connections == 1
+
+        for thread in threads:
+            thread.join(10)
+        broadcaster._thread.join(10)
+        for subscription in subscriptions:
+            LiveviewBroadcaster.unsubscribe(broadcaster, subscription)
+
+    # Every packet is parsed exactly once, however many clients are watching
+    assert broadcaster.frames_parsed == FRAME_COUNT
+    for frames in received:
+        assert frames
+        assert frames == sorted(set(frames))
+    assert LiveviewBroadcaster.find(camera.liveview_url) is None
+
+
+def test_parser_reads_packets_with_padding():
+    jpegs = [build_fake_jpeg(size) for size in (10, 1000, 70_000)]
+    data = b"".join(
+        build_liveview_packet(jpeg, i, i * 33, padding_size=i * 3)
+        for i, jpeg in enumerate(jpegs)
+    )
+    frames = list(LiveviewPacketParser(io.BytesIO(data)).iter_jpeg_frames())
+    assert [frame.sequence_number for frame in frames] == [0, 1, 2]
+    assert [frame.timestamp for frame in frames] == [0, 33, 66]
+    assert [bytes(frame.data) for frame in frames] == jpegs
+
+
+def test_parser_rejects_invalid_header():
+    data = bytearray(build_liveview_packet(build_fake_jpeg(100), 0, 0))
+    data[8:12] = b"\x00\x00\x00\x00"
+    with pytest.raises(ValueError):
+        list(LiveviewPacketParser(io.BytesIO(bytes(data))))
+
+
+def test_camera_stream_is_read_without_copies():
+    # http.client reads from the socket into the buffer of the frame, nothing is allocated per read
+    with FakeCamera(fps=1000, frame_size=200_000, frame_count=20) as camera:
+        stream = LiveviewBroadcaster.open_camera_stream(camera.liveview_url)
+        frames = LiveviewPacketParser(stream).iter_jpeg_frames()
+        # Frames are kept, so that a freed previous frame does not count as temporary memory
+        kept = [next(frames)]
+        tracemalloc.start()
+        try:
+            for frame in frames:
+                size, peak = tracemalloc.get_traced_memory()
+                assert peak - size < 64 * 1024
+                assert frame.data == camera.jpeg
+                kept.append(frame)
+                tracemalloc.reset_peak()
+        finally:
+            tracemalloc.stop()
+            stream.close()
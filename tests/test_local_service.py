@@ -0,0 +1,97 @@
+import socket
+
+import requests
+
+from fake_camera import FakeCamera
+
+
+def _payload(method: str, params=None) -> dict:
+    return {"method": method, "params": params or [], "id": 1, "version": "1.0"}
+
+
+def test_control_request_is_forwarded(local_service):
+    with FakeCamera() as camera:
+        response = requests.post(
+            f"{local_service.url}/camera_control",
+            json={
+                "action_list_url": camera.endpoint("camera"),
+                "payload": _payload("getApplicationInfo"),
+            },
+        )
+    assert response.status_code == 200
+    assert response.json() == {"result": ["Fake Camera", "2.1.4"], "id": 1}
+
+
+def test_camera_and_service_resolve_the_endpoint(local_service):
+    with FakeCamera() as camera:
+        local_service.service.camera_registry.update(
+            f"uuid:{camera.uuid}",
+            camera.location,
+            1800,
+            camera.device_description().encode("utf-8"),
+        )
+        response = requests.post(
+            f"{local_service.url}/camera_control",
+            json={
+                "camera": f"uuid:{camera.uuid}",
+                "service": "system",
+                "payload": _payload("getVersions"),
+            },
+        )
+        cameras = requests.get(f"{local_service.url}/cameras").json()["cameras"]
+    assert response.json()["result"] == [["1.0", "1.1"]]
+    assert cameras[f"uuid:{camera.uuid}"]["services"]["system"] == camera.endpoint(
+        "system"
+    )
+
+
+def test_batch_answers_every_entry(local_service):
+    with FakeCamera() as camera:
+        response = requests.post(
+            f"{local_service.url}/camera_control/batch",
+            json={
+                "action_list_url": camera.endpoint("camera"),
+                "requests": [
+                    {"payload": _payload("getVersions")},
+                    {"payload": _payload("getApplicationInfo")},
+                    {"action_list_url": camera.endpoint("camera")},
+                ],
+            },
+        )
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [200, 200, 400]
+    assert results[0]["response"]["result"] == [["1.0", "1.1"]]
+
+
+def test_invalid_requests_are_rejected(local_service):
+    url = local_service.url
+    assert requests.post(f"{url}/camera_control", json={}).status_code == 400
+    assert (
+        requests.post(f"{url}/camera_control/batch", json={"requests": []}).status_code
+        == 400
+    )
+    assert requests.get(f"{url}/liveview").status_code == 400
+    assert requests.get(f"{url}/camera_state?camera=unknown").status_code == 400
+    assert requests.get(f"{url}/unknown").status_code == 404
+
+
+def _raw_request(url: str, request: bytes) -> bytes:
+    host, port = url.removeprefix("http://").split(":")
+    with socket.create_connection((host, int(port)), timeout=5) as sock:
+        sock.sendall(request)
+        return sock.recv(1024)
+
+
+def test_malformed_requests_get_400(local_service):
+    # The threading server answers a broken request line the HTTP/0.9 way, without status line
+    assert b"400" in _raw_request(local_service.url, b"GARBAGE\r\n\r\n")
+    for content_length in (b"abc", b"-5"):
+        response = _raw_request(
+            local_service.url,
+            b"POST /camera_control HTTP/1.1\r\nContent-Length: "
+            + content_length
+            + b"\r\n\r\n",
+        )
+        assert response.startswith(b"HTTP/1.1 400") or response.startswith(
+            b"HTTP/1.0 400"
+        )
@@ -0,0 +1,84 @@
+import socket
+import time
+
+import pytest
+import requests
+
+from camera_search import CameraRegistry, SSDPSearch
+from fake_camera import FakeCamera
+
+
+def test_camera_is_found_within_milliseconds():
+    registry = CameraRegistry()
+    with FakeCamera() as camera:
+        searcher = SSDPSearch(
+            timeout=5,
+            registry=registry,
+            interfaces=[camera.host],
+            multicast_address=camera.ssdp_address,
+        )
+        start = time.monotonic()
+        device_description = searcher.retrieve_device_descriptions()
+        elapsed = time.monotonic() - start
+
+    assert device_description == camera.device_description().encode("utf-8")
+    # The search returns on the first response instead of waiting for the timeout
+    assert elapsed < 0.5
+    assert f"uuid:{camera.uuid}" in registry.get_cameras()
+
+
+@pytest.fixture
+def silent_responder():
+    # Receives the M-SEARCH requests, but never answers
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.setblocking(False)
+    yield sock
+    sock.close()
+
+
+def test_empty_search_stops_at_deadline(silent_responder):
+    searcher = SSDPSearch(
+        timeout=0.5,
+        interfaces=["127.0.0.1"],
+        multicast_address=silent_responder.getsockname(),
+    )
+    start = time.monotonic()
+    assert searcher.retrieve_device_descriptions() is None
+    elapsed = time.monotonic() - start
+
+    assert 0.5 <= elapsed < 0.7
+    m_searches = 0
+    while True:
+        try:
+            data = silent_responder.recv(1024)
+        except BlockingIOError:
+            break
+        assert data.startswith(b"M-SEARCH")
+        m_searches += 1
+    # The first M-SEARCH and the retransmits due before the deadline
+    assert 2 <= m_searches <= 1 + searcher.retransmits
+
+
+def test_device_description_gets_only_the_remaining_time():
+    with FakeCamera(latency=2) as camera:
+        searcher = SSDPSearch(
+            timeout=0.5,
+            interfaces=[camera.host],
+            multicast_address=camera.ssdp_address,
+        )
+        start = time.monotonic()
+        assert searcher.retrieve_device_descriptions() is None
+        elapsed = time.monotonic() - start
+    assert elapsed < 0.7
+
+
+def test_discover_timeout_parameter(local_service):
+    url = f"{local_service.url}/discover?refresh=1"
+    assert requests.get(f"{url}&timeout=abc").status_code == 400
+    assert requests.get(f"{url}&timeout=0").status_code == 400
+
+    start = time.monotonic()
+    response = requests.get(f"{url}&timeout=0.3")
+    assert time.monotonic() - start < 1.5
+    assert response.json() == {"error": "Device description fetching failed."}